@@ -6,15 +6,22 @@
 #
 
 import datetime
+import orjson
+import os
 import requests
+import time
 
 from logging import RootLogger
+from requests.adapters import HTTPAdapter
 
 HEADERS = {
     "Content-Type": "application/json",
     "lang": "en_US",
     "User-Agent": "Mozilla/5.0"
 }
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "optimshine")
+# (connect, read) timeouts in seconds, a stalled request must not block a job
+API_TIMEOUT = (5, 30)
 
 
 class ApiCommon:
@@ -24,6 +31,26 @@ class ApiCommon:
     """
     def __init__(self, log: RootLogger):
         self.log = log
+        self.session_setup()
+
+    def session_setup(self):
+        """
+        Sets up a persistent HTTP session shared by all API requests.
+
+        Keeping the session on the instance lets consecutive requests to
+        the same host reuse an already established TCP/TLS connection.
+        """
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        """
+        Closes the HTTP session and releases pooled connections.
+        """
+        if hasattr(self, "session"):
+            self.session.close()
 
     def api_post_request(self, api_url, request, token=None):
         """
@@ -43,14 +70,16 @@ class ApiCommon:
                           the request fails or the response cannot
                           be decoded.
         """
-        headers = HEADERS.copy()
-        if token:
-            headers.update({"Authorization": token})
-        response = requests.post(
-            api_url,
-            json=request,
-            headers=headers
-        )
+        try:
+            response = self.session.post(
+                api_url,
+                data=orjson.dumps(request),
+                headers={"Authorization": token} if token else None,
+                timeout=API_TIMEOUT
+            )
+        except requests.RequestException as e:
+            self.log.error(f"API post failed. {e}")
+            return None
 
         if response.status_code != 200:
             self.log.error(
@@ -59,14 +88,14 @@ class ApiCommon:
             return None
 
         try:
-            return response.json()
-        except requests.exceptions.JSONDecodeError:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
             self.log.error(
                 f"Failed to decode response message. Response: {response.text}"
             )
             return None
 
-    def api_get_request(self, api_url):
+    def api_get_request(self, api_url, params=None):
         """
         Sends a GET request to the specified API URL and returns
         the JSON response.
@@ -74,6 +103,8 @@ class ApiCommon:
         Args:
             api_url (str): The URL of the API endpoint to send the GET
                            request to.
+            params (dict or str, optional): The query parameters to append
+                                            to the URL.
 
         Returns:
             dict or None: The JSON response from the API if the request is
@@ -81,11 +112,12 @@ class ApiCommon:
                           None if the request fails or the response cannot
                           be decoded.
         """
-        headers = HEADERS.copy()
-        response = requests.get(
-            api_url,
-            headers=headers
-        )
+        try:
+            response = self.session.get(api_url, params=params,
+                                        timeout=API_TIMEOUT)
+        except requests.RequestException as e:
+            self.log.error(f"API get failed. {e}")
+            return None
 
         if response.status_code != 200:
             self.log.error(
@@ -94,13 +126,63 @@ class ApiCommon:
             return None
 
         try:
-            return response.json()
-        except requests.exceptions.JSONDecodeError:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
             self.log.error(
                 f"Failed to decode response message. Response: {response.text}"
             )
             return None
 
+    def cache_read(self, name, ttl=None):
+        """
+        Reads JSON data from a file in the cache directory.
+
+        Args:
+            name (str): The name of the cache file.
+            ttl (int, optional): The maximum age of the cache file in
+                                 seconds. The age is not checked if not set.
+
+        Returns:
+            dict or None: The cached data, or None if the cache file does
+                          not exist, is expired or cannot be decoded.
+        """
+        cache_path = os.path.join(CACHE_DIR, name)
+        try:
+            if ttl is not None and \
+                    os.path.getmtime(cache_path) < time.time() - ttl:
+                return None
+            with open(cache_path, "rb") as cache_file:
+                return orjson.loads(cache_file.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def cache_write(self, name, data):
+        """
+        Atomically writes JSON data to a file in the cache directory.
+        The file is readable only by its owner.
+
+        Args:
+            name (str): The name of the cache file.
+            data (dict): The data to be stored.
+
+        Returns:
+            bool: True if the data was written successfully,
+                  False otherwise.
+        """
+        cache_path = os.path.join(CACHE_DIR, name)
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0o600)
+            with os.fdopen(fd, "wb") as cache_file:
+                cache_file.write(orjson.dumps(data))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.log.warning(f"Writing {name} cache failed. {e}")
+            return False
+        return True
+
     def get_request_time(self, delta=None, future=False):
         """
         Get the current time adjusted by a specified delta.
@@ -117,8 +199,9 @@ class ApiCommon:
                  "YYYY-MM-DD HH:MM:SS" format.
         """
         if not delta:
-            now = datetime.datetime.now()
-        elif future:
+            return time.strftime("%Y-%m-%d %H:%M:%S")
+        # Wall clock arithmetic keeps the time of day across DST changes
+        if future:
             now = datetime.datetime.now() + delta
         else:
             now = datetime.datetime.now() - delta
@@ -5,8 +5,18 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 #
 
+import datetime
+
 from logging import RootLogger
 from optimshine.api_common import ApiCommon
+from urllib.parse import quote, urlencode
+from zoneinfo import ZoneInfo
+
+PSE_RCE_URL = "https://api.raporty.pse.pl/api/rce-pln"
+PSE_TIMEZONE = ZoneInfo("Europe/Warsaw")
+# Prices of the current day are reused until the next judge retry
+PSE_CACHE_TTL = 1800
+PSE_CACHE_NAME = "rce.json"
 
 
 class ApiPse(ApiCommon):
@@ -14,12 +24,38 @@ class ApiPse(ApiCommon):
     ApiPse is a class for interacting with the PSE RCE API.
     """
     def __init__(self, log: RootLogger):
-        self.log = log
+        super().__init__(log)
+
+    def _get_rce_hour_prices(self, rce_quarters):
+        """
+        Converts RCE prices keyed by the local quarter time into
+        a chronologically sorted list of prices keyed by the UTC timestamp
+        of the hour the quarter belongs to.
+
+        Args:
+            rce_quarters (dict): RCE prices keyed by the quarter time in
+                                 'YYYY-MM-DD HH:MM:SS' format.
+
+        Returns:
+            list: A list of (timestamp, price) tuples.
+        """
+        return sorted(
+            (
+                int(datetime.datetime.fromisoformat(quarter).replace(
+                    minute=0, second=0, tzinfo=PSE_TIMEZONE
+                ).timestamp()),
+                price
+            )
+            for quarter, price in rce_quarters.items()
+        )
 
     def get_pse_data(self, date):
         """
         Retrieves PSE RCE data for a specified date.
 
+        RCE prices of the last requested date are cached on disk for
+        PSE_CACHE_TTL seconds and read from the cache on subsequent calls.
+
         Args:
             date (str): The business date for which to retrieve RCE
                         data in 'YYYY-MM-DD' format.
@@ -28,12 +64,22 @@ class ApiPse(ApiCommon):
             bool: True if data retrieval is successful, False otherwise.
         """
         self.log.info(f"Getting PSE RCE data for {date}.")
-        pse_url = (
-            "https://api.raporty.pse.pl/api/rce-pln?$filter="
-            f"business_date%20eq%20%27{date}%27"
+        cached_rce = self.cache_read(PSE_CACHE_NAME, ttl=PSE_CACHE_TTL)
+        if cached_rce and cached_rce.get("date") == date:
+            self.rce_date = date
+            self.rce_prices = self._get_rce_hour_prices(
+                cached_rce["rce_quarters"]
+            )
+            self.log.info(f"RCE data for {self.rce_date} read from cache.")
+            return True
+
+        pse_params = urlencode(
+            {"$filter": f"business_date eq '{date}'"},
+            quote_via=quote,
+            safe="$"
         )
 
-        response = self.api_get_request(pse_url)
+        response = self.api_get_request(PSE_RCE_URL, params=pse_params)
         if not response:
             self.log.error("Getting PSE data failed!")
             return False
@@ -48,10 +94,16 @@ class ApiPse(ApiCommon):
             self.log.error("No RCE values available!")
             return False
 
-        self.rce_date = date
-        self.rce_prices = {
+        rce_quarters = {
             quarter["dtime"]: quarter["rce_pln"] for quarter in response_data
         }
+        self.rce_date = date
+        self.rce_prices = self._get_rce_hour_prices(rce_quarters)
+
+        self.cache_write(PSE_CACHE_NAME, {
+            "date": date,
+            "rce_quarters": rce_quarters,
+        })
 
         self.log.info(f"Successfully obtained RCE data for {self.rce_date}.")
         return True
@@ -5,8 +5,9 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 #
 
+import base64
 import datetime
-import jwt
+import orjson
 import os
 import time
 
@@ -24,6 +25,10 @@ SHINE_API_ENDPOINTS = {
     "setting_command": "/deviceCommand/create_setting_command",
     "command_status": "/deviceCommand/get_device_command_status",
 }
+SHINE_API_URLS = {
+    endpoint: f"{SHINE_API_URL}{path}"
+    for endpoint, path in SHINE_API_ENDPOINTS.items()
+}
 SHINE_PV_DATA_LABELS = {
     "pvTotalPower": "PV power generated",
     "acTtlInpower": "Grid power",
@@ -37,6 +42,45 @@ SHINE_SETTING_VALUES = {
     "battery_charge_current": "bmchc",
     "battery_discharge_current": "bmdcu",
 }
+SHINE_TOKEN_CACHE = "token.json"
+SHINE_PLANT_LIST_REQUEST = {
+    "pageNum": 1,
+    "pageSize": 10,
+    "plantName": "",
+    "deviceSn": "",
+    "status": "",
+    "isCollected": "",
+    "plantType": "",
+    "onGridType": "",
+    "tagName": "",
+    "realName": "",
+    "orgCode": "",
+    "authorized": "",
+    "cityId": "",
+    "countryId": "",
+    "provinceId": ""
+}
+SHINE_DEVICE_LIST_REQUEST = {
+    "pageNum": 1,
+    "pageSize": 10,
+    "scope": 0
+}
+SHINE_CHARGE_CURRENT_REQUEST = {
+    "timeZone": "Europe/Warsaw",
+    "oldVersion": 1,
+    "useType": 5,
+    "groupId": 1,
+    "realContentParam": [
+        "bmchc"
+    ]
+}
+SHINE_CHARGE_CURRENT_COMMAND = {
+    "dataHandlerType": 0,
+    "fieldName": "bmchc",
+    "groupId": 0,
+    "paramType": 0,
+    "useType": 3,
+}
 
 
 class ApiShine(ApiCommon):
@@ -49,7 +93,9 @@ class ApiShine(ApiCommon):
     settings and device values.
     """
     def __init__(self, log: RootLogger):
-        self.log = log
+        super().__init__(log)
+        self.token = None
+        self.token_ttl = 0
 
     def _get_shine_api_url(self, endpoint):
         """
@@ -62,10 +108,29 @@ class ApiShine(ApiCommon):
             str or None: The full API URL if the endpoint is valid,
                          None if the endpoint is not found.
         """
-        if endpoint not in SHINE_API_ENDPOINTS.keys():
+        api_url = SHINE_API_URLS.get(endpoint)
+        if not api_url:
             self.log.error(f"{endpoint} API endpoint not found!")
+        return api_url
+
+    def _get_token_expiry(self, token):
+        """
+        Reads the expiry time from the payload of a JWT login token.
+        The signature is not verified, only the payload is decoded.
+
+        Args:
+            token (str): The login token with the "Bearer_" prefix.
+
+        Returns:
+            int or None: The token expiry as a UTC timestamp, or None if
+                         the token cannot be decoded.
+        """
+        try:
+            payload = token[len("Bearer_"):].split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return orjson.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        except (IndexError, ValueError, AttributeError):
             return None
-        return f"{SHINE_API_URL}{SHINE_API_ENDPOINTS[endpoint]}"
 
     def login_shine(self):
         """
@@ -77,6 +142,9 @@ class ApiShine(ApiCommon):
         token. The token's time-to-live (TTL) is validated to ensure it does
         not exceed 24 hours.
 
+        The token is cached on disk, so a token that is still valid for
+        the same user is reused instead of sending another login request.
+
         Returns:
             bool: True if login is successful, False otherwise.
         """
@@ -94,41 +162,59 @@ class ApiShine(ApiCommon):
             self.log.error("Parsing login API URL failed!")
             return False
 
+        cached_token = self.cache_read(SHINE_TOKEN_CACHE)
+        if (cached_token and cached_token.get("user") == shine_user and
+                cached_token.get("token_ttl", 0) > time.time() + 60):
+            self.token = cached_token["token"]
+            self.token_ttl = cached_token["token_ttl"]
+            self.log.info("Valid login token found in cache.")
+            return True
+
         credentials = {
             "userName": shine_user,
             "password": shine_password,
             "lang": "en_US"
         }
 
-        self.log.debug(f"Sending login request to {login_url}")
+        # A failed login must be retried by the next token refresh
+        self.token_ttl = 0
+        self.log.debug("Sending login request to %s", login_url)
         login_response = self.api_post_request(login_url, credentials)
         if not login_response:
             self.log.error("Login attempt failed!")
             return False
 
         try:
-            self.token = login_response["data"]["token"]
+            token = login_response["data"]["token"]
         except (TypeError, KeyError):
             self.log.error(
                 f"Login attempt failed. {login_response}"
             )
             return False
 
-        if not self.token:
+        if not token:
             self.log.error(
                 "Login attempt failed. Login token not acquired."
             )
             return False
 
-        self.token_ttl = jwt.decode(
-            self.token[len("Bearer_"):],
-            options={"verify_signature": False}
-        ).get("exp")
+        token_ttl = self._get_token_expiry(token)
+        if not token_ttl:
+            self.log.error(
+                "Login attempt failed. Cannot read login token expiry."
+            )
+            return False
 
         # Max token time to live shouldn't be longer than 24h
         max_ttl = int(datetime.datetime.now().timestamp()) + 86400
-        if max_ttl < self.token_ttl:
-            self.token_ttl = max_ttl
+        self.token = token
+        self.token_ttl = min(token_ttl, max_ttl)
+
+        self.cache_write(SHINE_TOKEN_CACHE, {
+            "user": shine_user,
+            "token": self.token,
+            "token_ttl": self.token_ttl,
+        })
 
         self.log.info("Login attemp was successful.")
         return True
@@ -138,7 +224,7 @@ class ApiShine(ApiCommon):
         Retrieves a list of plants from the Shine API.
 
         This method checks if the session is authorized by verifying
-        the presence of a token. It sends a request to the plant list
+        that a token is set. It sends a request to the plant list
         endpoint and processes the response to extract plant information.
         If successful, it populates the `plants_id` attribute with the
         plant details.
@@ -147,32 +233,15 @@ class ApiShine(ApiCommon):
             bool: True if the plant list is successfully obtained,
                   False otherwise.
         """
-        if not hasattr(self, "token"):
+        if not self.token:
             self.log.error("Session is not authorized!")
             return False
 
         plant_url = self._get_shine_api_url("plant_list")
-        plant_request = {
-          "pageNum": 1,
-          "pageSize": 10,
-          "plantName": "",
-          "deviceSn": "",
-          "status": "",
-          "isCollected": "",
-          "plantType": "",
-          "onGridType": "",
-          "tagName": "",
-          "realName": "",
-          "orgCode": "",
-          "authorized": "",
-          "cityId": "",
-          "countryId": "",
-          "provinceId": ""
-        }
-        self.log.debug(f"Sending plant list request to {plant_url}")
+        self.log.debug("Sending plant list request to %s", plant_url)
         response = self.api_post_request(
             plant_url,
-            plant_request,
+            SHINE_PLANT_LIST_REQUEST,
             self.token
         )
         if not response:
@@ -189,19 +258,16 @@ class ApiShine(ApiCommon):
             self.log.error("No plants available!")
             return False
 
-        self.plants_id = {}
-        for plant in plants_data:
-            self.log.debug(f'ID - {plant["plantName"]}: {plant["id"]}')
-            self.plants_id.update(
-                {
-                    plant["plantName"]: {
-                        "id": plant["id"],
-                        "longitude": plant["longitude"],
-                        "latitude": plant["latitude"],
-                        "timezone": plant["timeZone"],
-                    }
-                }
-            )
+        self.plants_id = {
+            plant["plantName"]: {
+                "id": plant["id"],
+                "longitude": plant["longitude"],
+                "latitude": plant["latitude"],
+                "timezone": plant["timeZone"],
+            } for plant in plants_data
+        }
+        for plant_name, plant in self.plants_id.items():
+            self.log.debug("ID - %s: %s", plant_name, plant["id"])
 
         self.log.info("Plant list successfully obtained.")
         return True
@@ -219,20 +285,18 @@ class ApiShine(ApiCommon):
             bool: True if the device list was successfully obtained,
                   False otherwise.
         """
-        if not hasattr(self, "token"):
+        if not self.token:
             self.log.error("Session is not authorized!")
             return False
 
         device_list_url = self._get_shine_api_url("device_list")
         inverter_list_request = {
-          "pageNum": 1,
-          "pageSize": 10,
-          "deviceType": device_type,
-          "plantId": plant_id,
-          "scope": 0
+            **SHINE_DEVICE_LIST_REQUEST,
+            "deviceType": device_type,
+            "plantId": plant_id,
         }
-        self.log.debug(f"Sending {device_type} list request to "
-                       f"{device_list_url}")
+        self.log.debug("Sending %s list request to %s", device_type,
+                       device_list_url)
         response = self.api_post_request(
             device_list_url,
             inverter_list_request,
@@ -253,7 +317,8 @@ class ApiShine(ApiCommon):
 
         self.device_list = []
         for device in device_data:
-            self.log.debug(f'{device_type} Serial Number {device["deviceSn"]}')
+            self.log.debug("%s Serial Number %s", device_type,
+                           device["deviceSn"])
             self.device_list.append(device["deviceSn"])
 
         self.log.info(f"{device_type} list successfully obtained.")
@@ -272,7 +337,7 @@ class ApiShine(ApiCommon):
         Returns:
             bool: True if data retrieval is successful, False otherwise.
         """
-        if not hasattr(self, "token"):
+        if not self.token:
             self.log.error("Session is not authorized!")
             return False
 
@@ -296,7 +361,7 @@ class ApiShine(ApiCommon):
           ]
         }
 
-        self.log.debug(f"Sending data request to {production_data_url}")
+        self.log.debug("Sending data request to %s", production_data_url)
         response = self.api_post_request(
             production_data_url,
             get_data_request,
@@ -321,42 +386,35 @@ class ApiShine(ApiCommon):
             "inverter_sn": inverter_serial_number,
             "data_date": data_date,
             "data_time": pv_data_time,
-            "data": {}
-        }
-        for param in pv_data:
-            param_data = {
+            "data": {
                 param["field"]: {
                     "label": SHINE_PV_DATA_LABELS[param["field"]],
                     "data": param["data"],
                     "unit": param["unit"],
-                },
+                } for param in pv_data
             }
-            self.pv_data["data"].update(param_data)
-
+        }
         self.log.info("PV production data successfully obtained.")
         return True
 
-    def get_setting_value(self, inverter_serial_number, value_name):
+    def _request_setting_value(self, inverter_serial_number, value_name):
         """
-        Retrieves the specified setting value for a given inverter.
+        Requests the specified setting value for a given inverter and
+        returns it instead of storing it on the instance, so it can be
+        safely called for several inverters at the same time.
 
         Args:
             inverter_serial_number (str): The serial number of the inverter.
             value_name (str): The name of the setting value to retrieve.
 
         Returns:
-            bool: True if the setting value was successfully obtained,
-                  False otherwise.
+            float or None: The setting value if retrieval is successful,
+                           None otherwise.
         """
-        if not hasattr(self, "token"):
-            self.log.error("Session is not authorized!")
-            return False
-
-        try:
-            value_alias = SHINE_SETTING_VALUES[value_name]
-        except (TypeError, KeyError):
+        value_alias = SHINE_SETTING_VALUES.get(value_name)
+        if value_alias is None:
             self.log.error(f"{value_name} is not supported!")
-            return False
+            return None
 
         settings_url = self._get_shine_api_url("setting_values")
         get_settings_request = {
@@ -364,7 +422,8 @@ class ApiShine(ApiCommon):
             "oldVersion": 1
         }
 
-        self.log.debug(f"Sending setting values request to {settings_url}")
+        self.log.debug("Sending setting values request to %s",
+                       settings_url)
         response = self.api_post_request(
             settings_url,
             get_settings_request,
@@ -372,41 +431,61 @@ class ApiShine(ApiCommon):
         )
         if not response:
             self.log.error("Getting setting values failed!")
-            return False
+            return None
         try:
-            self.setting_value = (
-                response["data"][value_alias]
-            )
+            setting_value = response["data"][value_alias]
         except (TypeError, KeyError):
             self.log.error(f"Getting {value_name} value failed."
                            f" {response}")
-            return False
+            return None
 
         self.log.info(f"{value_name} value successfully obtained.")
-        return True
+        return setting_value
 
-    def get_device_value(self, inverter_serial_number, value_name):
+    def get_setting_value(self, inverter_serial_number, value_name):
         """
-        Retrieves the specified device value for a given inverter.
+        Retrieves the specified setting value for a given inverter.
 
         Args:
             inverter_serial_number (str): The serial number of the inverter.
-            value_name (str): The name of the value to retrieve.
-                              Currently supported value names: battery_soc
+            value_name (str): The name of the setting value to retrieve.
 
         Returns:
-            bool: True if the value was successfully obtained, False otherwise.
+            bool: True if the setting value was successfully obtained,
+                  False otherwise.
         """
-        if not hasattr(self, "token"):
+        if not self.token:
             self.log.error("Session is not authorized!")
             return False
 
-        try:
-            value_alias = SHINE_DEVICE_VALUES[value_name]
-        except (TypeError, KeyError):
-            self.log.error(f"{value_name} is not supported!")
+        setting_value = self._request_setting_value(inverter_serial_number,
+                                                    value_name)
+        if setting_value is None:
             return False
 
+        self.setting_value = setting_value
+        return True
+
+    def _request_device_value(self, inverter_serial_number, value_name):
+        """
+        Requests the specified device value for a given inverter and
+        returns it instead of storing it on the instance, so it can be
+        safely called for several inverters at the same time.
+
+        Args:
+            inverter_serial_number (str): The serial number of the inverter.
+            value_name (str): The name of the value to retrieve.
+                              Currently supported value names: battery_soc
+
+        Returns:
+            float or None: The device value if retrieval is successful,
+                           None otherwise.
+        """
+        value_alias = SHINE_DEVICE_VALUES.get(value_name)
+        if value_alias is None:
+            self.log.error(f"{value_name} is not supported!")
+            return None
+
         device_url = self._get_shine_api_url("device_values")
         get_device_request = {
             "deviceSn": inverter_serial_number,
@@ -414,7 +493,7 @@ class ApiShine(ApiCommon):
             "dateStr": self.get_request_time(),
         }
 
-        self.log.debug(f"Sending device values request to {device_url}")
+        self.log.debug("Sending device values request to %s", device_url)
         response = self.api_post_request(
             device_url,
             get_device_request,
@@ -422,23 +501,48 @@ class ApiShine(ApiCommon):
         )
         if not response:
             self.log.error("Getting device values failed!")
-            return False
+            return None
         try:
-            self.device_value = (
-                response["data"][value_alias]
-            )
+            device_value = response["data"][value_alias]
         except (TypeError, KeyError):
             self.log.error(f"Getting {value_name} value failed."
                            f" {response}")
-            return False
+            return None
 
         self.log.info(f"{value_name} value successfully obtained.")
+        return device_value
+
+    def get_device_value(self, inverter_serial_number, value_name):
+        """
+        Retrieves the specified device value for a given inverter.
+
+        Args:
+            inverter_serial_number (str): The serial number of the inverter.
+            value_name (str): The name of the value to retrieve.
+                              Currently supported value names: battery_soc
+
+        Returns:
+            bool: True if the value was successfully obtained, False otherwise.
+        """
+        if not self.token:
+            self.log.error("Session is not authorized!")
+            return False
+
+        device_value = self._request_device_value(inverter_serial_number,
+                                                  value_name)
+        if device_value is None:
+            return False
+
+        self.device_value = device_value
         return True
 
     def _setting_command_status(self, id, timeout=10):
         """
         Checks the status of a setting command (e.g. setting charging current).
 
+        The status is polled with an exponential backoff, starting at 100 ms
+        and capped at 2 s, so quickly applied commands return early.
+
         Args:
             id (int): The identifier of the command whose status is read
             timeout (int, optional): The maximum time to wait for the command
@@ -447,16 +551,18 @@ class ApiShine(ApiCommon):
             bool: True if the setting command sets value successfully,
                   False otherwise.
         """
-        if not hasattr(self, "token"):
+        if not self.token:
             self.log.error("Session is not authorized!")
             return False
 
         command_status_url = self._get_shine_api_url("command_status")
         command_status_request = {"id": id}
-        self.log.debug("Sending setting command request to"
-                       f" {command_status_url}")
+        self.log.debug("Sending setting command request to %s",
+                       command_status_url)
 
-        for _ in range(0, timeout, 2):
+        deadline = time.monotonic() + timeout
+        delay = 0.1
+        while time.monotonic() < deadline:
             response = self.api_post_request(
                 command_status_url,
                 command_status_request,
@@ -474,44 +580,39 @@ class ApiShine(ApiCommon):
             if command_status == 1:
                 self.log.info("Setting command sent successfuly.")
                 return True
-            else:
-                time.sleep(2)
+            # Request latency counts towards the timeout
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 2.0)
         self.log.error("Command timeout!")
         return False
 
     def set_charge_current(self, inverter_serial_number, current):
-        if not hasattr(self, "token"):
+        if not self.token:
             self.log.error("Session is not authorized!")
             return False
 
         current_formated = str(float(current))
-        self.log.debug(f"Current value to set: {current_formated}")
-        timestamp_ms = int(datetime.datetime.now().timestamp() * 1000)
+        self.log.debug("Current value to set: %s", current_formated)
+        timestamp_ms = int(time.time() * 1000)
         settings_url = self._get_shine_api_url("setting_command")
 
         charge_current_request = {
+            **SHINE_CHARGE_CURRENT_REQUEST,
             "deviceSn": inverter_serial_number,
-            "timeZone": "Europe/Warsaw",
             "timestamp": timestamp_ms,
-            "oldVersion": 1,
-            "useType": 5,
-            "groupId": 1,
             "deviceCommands": [
                 {
-                    "dataHandlerType": 0,
-                    "fieldName": "bmchc",
-                    "groupId": 0,
-                    "paramType": 0,
-                    "useType": 3,
+                    **SHINE_CHARGE_CURRENT_COMMAND,
                     "fieldValue": current_formated
                 }
             ],
-            "realContentParam": [
-                "bmchc"
-            ]
         }
 
-        self.log.debug(f"Sending setting command request to {settings_url}")
+        self.log.debug("Sending setting command request to %s",
+                       settings_url)
         response = self.api_post_request(
             settings_url,
             charge_current_request,
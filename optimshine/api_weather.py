@@ -5,13 +5,40 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 #
 
-import datetime
-
-from zoneinfo import ZoneInfo
+import calendar
+import functools
 
+from concurrent.futures import ThreadPoolExecutor
 from logging import RootLogger
 from optimshine.api_common import ApiCommon
 
+SUNRISE_URL = "https://api.sunrise-sunset.org/json"
+WEATHER_URL = "https://devmgramapi.meteo.pl/meteorograms/um4_60"
+SUNRISE_CACHE_SIZE = 256
+
+# Sunrise and sunset times keyed by (latitude, longitude, date)
+_sunrise_cache = {}
+
+
+@functools.lru_cache(maxsize=8)
+def _date_midnight_ts(date):
+    """
+    Returns the UTC timestamp of midnight for the given 'YYYY-MM-DD' date.
+    """
+    year, month, day = (int(part) for part in date.split("-"))
+    return calendar.timegm((year, month, day, 0, 0, 0))
+
+
+def _hour_from_ampm(time):
+    """
+    Returns the 24-hour clock hour of the given 'HH:MM:SS AM/PM' time.
+    """
+    # 12 AM is midnight and 12 PM is noon
+    hour = int(time.split(":", 1)[0]) % 12
+    if time.endswith("PM"):
+        hour += 12
+    return hour
+
 
 class ApiWeather(ApiCommon):
     """
@@ -20,7 +47,7 @@ class ApiWeather(ApiCommon):
     to obtain sunrise and sunset times, as well as weather data.
     """
     def __init__(self, log: RootLogger):
-        self.log = log
+        super().__init__(log)
 
     def get_timestamp_hour(self, date, time):
         """
@@ -34,13 +61,7 @@ class ApiWeather(ApiCommon):
         Returns:
             int: The UTC timestamp corresponding to the start of the hour.
         """
-        dt_time = datetime.datetime.strptime(
-            f"{date} {time}",
-            "%Y-%m-%d %I:%M:%S %p",
-        )
-        hour = dt_time.replace(minute=0, second=0, microsecond=0,
-                               tzinfo=ZoneInfo("UTC"))
-        return int(hour.timestamp())
+        return _date_midnight_ts(date) + _hour_from_ampm(time) * 3600
 
     def _get_solar_sunrise_sunset_time(self, latitude, longitude, date):
         """
@@ -56,12 +77,18 @@ class ApiWeather(ApiCommon):
             bool: True if the sunrise and sunset times were successfully
                   obtained, False otherwise.
         """
-        sunrise_url = "https://api.sunrise-sunset.org/json?"
-        sunrise_args = f"lat={latitude}&lng={longitude}&date={date}"
+        cache_key = (latitude, longitude, date)
+        cached = _sunrise_cache.get(cache_key)
+        if cached:
+            self.sunrise, self.sunset = cached
+            self.log.debug("Sunrise/sunset time for %s read from cache.", date)
+            return True
+
+        sunrise_args = {"lat": latitude, "lng": longitude, "date": date}
 
-        self.log.debug("Sending sunrise/sunset request to"
-                       f" {sunrise_url}{sunrise_args}")
-        response = self.api_get_request(f"{sunrise_url}{sunrise_args}")
+        self.log.debug("Sending sunrise/sunset request to %s with %s",
+                       SUNRISE_URL, sunrise_args)
+        response = self.api_get_request(SUNRISE_URL, sunrise_args)
         if not response:
             self.log.error("Getting sunrise/sunset data failed!")
             return False
@@ -69,12 +96,45 @@ class ApiWeather(ApiCommon):
             self.sunrise = response["results"]["sunrise"]
             self.sunset = response["results"]["sunset"]
         except (TypeError, KeyError):
-            self.log.error(f"Getting weather data failed. {response}")
+            self.log.error("Getting weather data failed. %s", response)
             return False
 
+        if len(_sunrise_cache) >= SUNRISE_CACHE_SIZE:
+            _sunrise_cache.clear()
+        _sunrise_cache[cache_key] = (self.sunrise, self.sunset)
         self.log.info("Sunrise/sunset time obtained successfully.")
         return True
 
+    def _get_weather_forecast(self, latitude, longitude, date):
+        """
+        Retrieves the weather forecast for a given location and date.
+
+        Args:
+            latitude (float): The latitude of the location.
+            longitude (float): The longitude of the location.
+            date (str): The date of the forecast in 'YYYY-MM-DD' format.
+
+        Returns:
+            dict or None: The forecast response, or None if the request
+                          fails.
+        """
+
+        weather_ts = self.get_timestamp_hour(date, "12:00:00 AM")
+        self.log.debug("Latitude: %s", latitude)
+        self.log.debug("Longitude: %s", longitude)
+        self.log.debug("Weather timestamp: %s", weather_ts)
+
+        weather_data_request = {
+            "date": weather_ts,
+            "point": {
+                "lat": latitude,
+                "lon": longitude
+            }
+        }
+
+        self.log.debug("Sending weather request to %s", WEATHER_URL)
+        return self.api_post_request(WEATHER_URL, weather_data_request)
+
     def get_weather_data(self, latitude, longitude, date):
         """
         Retrieves weather data (sunrise and sunset times, low cloud data)
@@ -90,44 +150,44 @@ class ApiWeather(ApiCommon):
             bool: True if weather data is successfully obtained,
                   False otherwise.
         """
-        if not self._get_solar_sunrise_sunset_time(latitude, longitude,
-                                                   date):
+        if (latitude, longitude, date) in _sunrise_cache:
+            # Sunrise and sunset are known, only the forecast is requested
+            sun_status = self._get_solar_sunrise_sunset_time(latitude,
+                                                             longitude,
+                                                             date)
+            response = self._get_weather_forecast(latitude, longitude, date)
+        else:
+            # The weather request does not depend on the sunrise/sunset
+            # times, so both requests are sent at the same time.
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                sun_future = executor.submit(
+                    self._get_solar_sunrise_sunset_time,
+                    latitude, longitude, date
+                )
+                weather_future = executor.submit(self._get_weather_forecast,
+                                                 latitude, longitude, date)
+                sun_status = sun_future.result()
+                response = weather_future.result()
+
+        if not sun_status:
             self.log.error("Error during obtaining sunrise or sunset!")
             return False
 
-        if not self.sunrise or not self.sunset:
+        sunrise, sunset = self.sunrise, self.sunset
+        if not sunrise or not sunset:
             self.log.error("Sunrise or sunset cannot be none!")
             return False
 
-        sunrise_hour_ts = self.get_timestamp_hour(date, self.sunrise)
-        sunset_hour_ts = self.get_timestamp_hour(date, self.sunset)
+        sunrise_hour_ts = self.get_timestamp_hour(date, sunrise)
+        sunset_hour_ts = self.get_timestamp_hour(date, sunset)
         # Day ends after 12 AM
         if sunrise_hour_ts > sunset_hour_ts:
             sunset_hour_ts += 86400
         # First full hour after sunset
         sunset_hour_ts += 3600
-        self.log.debug(f"Sunrise timestamp: {sunrise_hour_ts}")
-        self.log.debug(f"Sunset timestamp: {sunset_hour_ts}")
-
-        weather_ts = self.get_timestamp_hour(date, "12:00:00 AM")
-        self.log.debug(f"Latitude: {latitude}")
-        self.log.debug(f"Longitude: {longitude}")
-        self.log.debug(f"Weather timestamp: {weather_ts}")
-
-        weather_data_url = "https://devmgramapi.meteo.pl/meteorograms/um4_60"
-        weather_data_request = {
-            "date": weather_ts,
-            "point": {
-                "lat": latitude,
-                "lon": longitude
-            }
-        }
+        self.log.debug("Sunrise timestamp: %s", sunrise_hour_ts)
+        self.log.debug("Sunset timestamp: %s", sunset_hour_ts)
 
-        self.log.debug(f"Sending weather request to {weather_data_url}")
-        response = self.api_post_request(
-            weather_data_url,
-            weather_data_request
-        )
         if not response:
             self.log.error("Getting weather data failed!")
             return False
@@ -135,12 +195,12 @@ class ApiWeather(ApiCommon):
             first_sample_time = int(
                 response["data"]["cldlow_aver"]["first_timestamp"]
             )
-            self.log.debug(f"First timestamp: {first_sample_time}")
+            self.log.debug("First timestamp: %s", first_sample_time)
             interval = response["data"]["cldlow_aver"]["interval"]
             low_clouds_data = response["data"]["cldlow_aver"]["data"]
             samples_num = len(low_clouds_data)
         except (TypeError, KeyError):
-            self.log.error(f"Getting weather data failed. {response}")
+            self.log.error("Getting weather data failed. %s", response)
             return False
 
         if sunrise_hour_ts < first_sample_time:
@@ -152,7 +212,7 @@ class ApiWeather(ApiCommon):
             return False
 
         # Polar night/Polar day
-        if self.sunrise == self.sunset:
+        if sunrise == sunset:
             self.weather_data = {
                 "date": date,
                 "first_sample_time": first_sample_time,
@@ -164,26 +224,22 @@ class ApiWeather(ApiCommon):
             self.log.info("Weather data obtained successfully")
             return True
 
-        if not (sunrise_hour_ts % interval ==
-                sunset_hour_ts % interval ==
-                first_sample_time % interval == 0):
+        if (sunrise_hour_ts % interval or sunset_hour_ts % interval
+                or first_sample_time % interval):
             self.log.error("Timestamps must be divisible by interval"
                            " otherwise sample numbers won't be correct")
             return False
 
         # Amount of hours from the beginning of the forecast
-        first_sample = (sunrise_hour_ts - first_sample_time)/interval
-        first_sample = int(first_sample)
-        self.log.debug(f"First sample: {first_sample}")
+        first_sample = (sunrise_hour_ts - first_sample_time) // interval
+        self.log.debug("First sample: %s", first_sample)
 
-        last_sample = (sunset_hour_ts - first_sample_time)/interval
-        last_sample = int(last_sample)
-        self.log.debug(f"Last sample: {last_sample}")
+        last_sample = (sunset_hour_ts - first_sample_time) // interval
+        self.log.debug("Last sample: %s", last_sample)
 
         samples_num = last_sample - first_sample
-        striped_cloud_data = [
-            low_clouds_data[i+first_sample] for i in range(0, samples_num)
-        ]
+        striped_cloud_data = low_clouds_data[first_sample:
+                                             first_sample + samples_num]
         self.weather_data = {
                 "date": date,
                 "first_sample_time": sunrise_hour_ts,
@@ -6,8 +6,9 @@
 #
 
 import colorlog
+import os
 import sys
-import time
+import threading
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.events import (
@@ -16,7 +17,7 @@ from apscheduler.events import (
     EVENT_JOB_SUBMITTED,
     EVENT_JOB_MISSED,
 )
-from dotenv import load_dotenv, find_dotenv
+from dotenv import load_dotenv
 from signal import signal, SIGINT, SIGTERM
 
 
@@ -61,13 +62,26 @@ class OptimConfig:
             print("Logger not found!")
             return False
 
-        if not find_dotenv(filename=envpath):
+        if not os.path.exists(envpath):
             self.log.error(f"Env file not found at {envpath}")
             return False
 
         load_dotenv(envpath)
         return True
 
+    def _job_done(self, job_id):
+        """
+        Removes the job ID from the running jobs and marks the scheduler
+        as idle when no job is left running.
+
+        Args:
+            job_id (str): The ID of the job that is no longer running.
+        """
+        with self._jobs_lock:
+            self.running_jobs.discard(job_id)
+            if not self.running_jobs:
+                self._idle.set()
+
     def _job_running_listener(self, event):
         """
         Listener for job running events. Updates the state of missed and
@@ -77,10 +91,13 @@ class OptimConfig:
             event: An object containing information about the job event,
                    including job_id.
         """
-        if event.job_id in self.missed_jobs:
-            self.missed_jobs.discard(event.job_id)
-        else:
-            self.running_jobs.add(event.job_id)
+        job_id = event.job_id
+        with self._jobs_lock:
+            if job_id in self.missed_jobs:
+                self.missed_jobs.discard(job_id)
+                return
+            self.running_jobs.add(job_id)
+            self._idle.clear()
 
     def _job_missed_listener(self, event):
         """
@@ -94,10 +111,14 @@ class OptimConfig:
             event: An event object containing information about the job event,
                    including the job_id attribute.
         """
-        if event.job_id not in self.running_jobs:
-            self.missed_jobs.add(event.job_id)
-        else:
-            self.running_jobs.discard(event.job_id)
+        job_id = event.job_id
+        with self._jobs_lock:
+            if job_id not in self.running_jobs:
+                self.missed_jobs.add(job_id)
+                return
+            self.running_jobs.discard(job_id)
+            if not self.running_jobs:
+                self._idle.set()
 
     def _job_finished_listener(self, event):
         """
@@ -108,7 +129,7 @@ class OptimConfig:
             event: An object containing information about the finished job,
                    including the job_id of the completed job.
         """
-        self.running_jobs.discard(event.job_id)
+        self._job_done(event.job_id)
 
     def _job_error_listener(self, event):
         """
@@ -119,8 +140,25 @@ class OptimConfig:
             event: An object containing information about the job event,
                    including the job_id of the finished job.
         """
-        self.running_jobs.discard(event.job_id)
-        self.log.error(f"{event.job_id} job finished with error")
+        job_id = event.job_id
+        self._job_done(job_id)
+        self.log.error(f"{job_id} job finished with error")
+
+    def _jobs_done_listener(self, _):
+        """
+        Listener for finished and missed job events. Marks all jobs as
+        done when no job is scheduled or running anymore.
+
+        Removal events are not handled, because a date job is removed from
+        the job store before its submission is reported, while it may still
+        reschedule itself.
+
+        Args:
+            _: Unused event object.
+        """
+        with self._jobs_lock:
+            if not self.scheduler.get_jobs() and not self.running_jobs:
+                self._jobs_done.set()
 
     def _signal_handler(self, signum, _):
         """
@@ -141,8 +179,7 @@ class OptimConfig:
             self.log.warning(
                 f"Finishing currently running jobs: {self.running_jobs}"
             )
-            while self.running_jobs:
-                time.sleep(5)
+            self._idle.wait()
         self.scheduler.shutdown()
         self.log.info("Scheduler shutdown was successful, exiting")
         sys.exit(0)
@@ -159,6 +196,13 @@ class OptimConfig:
         self.scheduler = BackgroundScheduler()
         self.running_jobs = set()
         self.missed_jobs = set()
+        # Listeners run on the scheduler and on the executor threads
+        self._jobs_lock = threading.Lock()
+        # Set when no job is running, the shutdown waits on it
+        self._idle = threading.Event()
+        self._idle.set()
+        # Set when no job is scheduled or running anymore
+        self._jobs_done = threading.Event()
         self.scheduler.add_listener(self._job_running_listener,
                                     EVENT_JOB_SUBMITTED)
         self.scheduler.add_listener(self._job_missed_listener,
@@ -167,6 +211,11 @@ class OptimConfig:
                                     EVENT_JOB_EXECUTED)
         self.scheduler.add_listener(self._job_error_listener,
                                     EVENT_JOB_ERROR)
+        # Added last, so it sees running_jobs already updated
+        self.scheduler.add_listener(
+            self._jobs_done_listener,
+            EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+        )
         signal(SIGINT, self._signal_handler)
         signal(SIGTERM, self._signal_handler)
 
@@ -187,5 +236,6 @@ class OptimConfig:
 
         self.log.debug("----------- List of jobs ------------")
         for job in jobs:
-            self.log.debug(f"Job ID: {job.id}, Next run: {job.next_run_time}")
+            self.log.debug("Job ID: %s, Next run: %s", job.id,
+                           job.next_run_time)
         self.log.debug("-------------------------------------")
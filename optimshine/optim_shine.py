@@ -7,10 +7,12 @@
 
 import os
 import sys
-import time
 import sdnotify
+import threading
+import time
 
 from datetime import datetime, timedelta
+from operator import itemgetter
 from zoneinfo import ZoneInfo
 
 from optimshine.api_shine import ApiShine
@@ -19,12 +21,15 @@ from optimshine.api_pse import ApiPse
 from optimshine.optim_config import OptimConfig
 
 
+UTC = ZoneInfo("UTC")
 CHARGE_MODES = {
     "no_charge": 1,
     "slow_charge": 30,
     "normal_charge": 60,
     "fast_charge": 90,
 }
+# Watchdog notification interval when systemd does not set WATCHDOG_USEC
+WATCHDOG_INTERVAL = 5
 
 
 class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
@@ -38,11 +43,19 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
         self.soc_check_date: datetime = None
         self.optim = False
         self.optim_date: datetime = None
+        self.token = None
+        self.token_ttl = 0
+        # Charge jobs of several inverters may refresh the token at once
+        self._token_lock = threading.Lock()
+        self.plant = None
+        self.inverters = None
+        self.weather_data = None
 
         self.notifier = sdnotify.SystemdNotifier()
         self.notifier.notify("READY=1")
         self.logger_setup()
         self.envs_setup(envpath=envpath)
+        self.session_setup()
         self.scheduler_setup()
 
     def _shine_setup(self):
@@ -93,8 +106,7 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
             self.log.critical("No inverters found. Exiting...")
             sys.exit(1)
 
-        self.inverters = self.device_list.copy()
-        self.device_list = None
+        self.inverters, self.device_list = self.device_list, None
         self.log.info("API Shine setup was successful")
 
     def _check_weather(self, latitude, longitude, date):
@@ -113,18 +125,27 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
                   otherwise False.
         """
         self.not_cloudy = False
-        not_cloudy_hours = 0
 
         if not self.get_weather_data(latitude, longitude, date):
             self.log.error("Weather forecast is not available")
             return False
 
-        for sample in self.weather_data["low_clouds_data"]:
+        low_clouds_data = self.weather_data["low_clouds_data"]
+        # More than half of the hours must be clear, stop once it's decided
+        not_cloudy_limit = len(low_clouds_data) // 2
+        cloudy_limit = len(low_clouds_data) - not_cloudy_limit
+        not_cloudy_hours = 0
+        cloudy_hours = 0
+        for sample in low_clouds_data:
             if sample < 0.75:
                 not_cloudy_hours += 1
-
-        if not_cloudy_hours > len(self.weather_data["low_clouds_data"])/2:
-            self.not_cloudy = True
+                if not_cloudy_hours > not_cloudy_limit:
+                    self.not_cloudy = True
+                    break
+            else:
+                cloudy_hours += 1
+                if cloudy_hours >= cloudy_limit:
+                    break
 
         return True
 
@@ -137,43 +158,53 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
             bool: True if the judge factors are successfully obtained,
                   False otherwise.
         """
-        if not hasattr(self, "plant"):
+        if self.plant is None:
             self.log.error("No plant info available")
             return False
 
         date = datetime.now().strftime("%Y-%m-%d")
 
-        self.log.debug("Trying to get weather data")
-        if not self._check_weather(self.plant["latitude"],
-                                   self.plant["longitude"],
-                                   date):
-            self.log.error("Failed to check weather")
-            return False
-        self.log.debug(f"not_cloudy flag: {self.not_cloudy}")
+        # A judge retry reuses the forecast if only the RCE prices failed
+        if self.weather_data and self.weather_data["date"] == date:
+            self.log.debug("Weather data for %s already obtained", date)
+        else:
+            self.log.debug("Trying to get weather data")
+            if not self._check_weather(self.plant["latitude"],
+                                       self.plant["longitude"],
+                                       date):
+                self.log.error("Failed to check weather")
+                return False
+        self.log.debug("not_cloudy flag: %s", self.not_cloudy)
 
         self.log.debug("Trying to get PSE data")
         if not self.get_pse_data(date):
             self.log.error("Failed to get RCE prices")
             return False
 
-        self.min_price = next(iter(self.rce_prices.values()))
-        for quarter, price in self.rce_prices.items():
-            if price < self.min_price:
-                time = datetime.strptime(quarter, "%Y-%m-%d %H:%M:%S").replace(
-                    tzinfo=ZoneInfo("Europe/Warsaw")
-                ).astimezone(ZoneInfo("UTC"))
-                self.min_price_timestamp = self.get_timestamp_hour(
-                    time.strftime("%Y-%m-%d"),
-                    time.strftime("%I:%M:%S %p")
-                )
-                self.min_price = price
+        self.min_price_timestamp, self.min_price = min(self.rce_prices,
+                                                       key=itemgetter(1))
 
-        self.log.debug(f"min_price_timestamp: {self.min_price_timestamp}")
-        self.log.debug(f"min_price: {self.min_price}")
+        self.log.debug("min_price_timestamp: %s", self.min_price_timestamp)
+        self.log.debug("min_price: %s", self.min_price)
 
         self.log.info("Successfully obtained judge factors")
         return True
 
+    def _refresh_token(self):
+        """
+        Logs in to the Shine API again when the authorization token
+        expires within a minute. Concurrent callers wait for a single
+        login instead of each sending their own.
+
+        Returns:
+            bool: True if the token is valid, False if the login failed.
+        """
+        # token_ttl is the wall clock expiry checked by the Shine API
+        with self._token_lock:
+            if self.token_ttl - 60 < time.time():
+                return self.login_shine()
+        return True
+
     def optim_charge_battery(self, inverter, mode):
         """
         Optimizes the battery charging current based on the specified mode.
@@ -192,29 +223,28 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
                           settings, or setting the charge current.
             AttributeError: If the provided mode is unknown.
         """
-        time_now = datetime.now().timestamp()
         self.log.debug("Checking if token is valid")
-        if self.token_ttl < time_now and not self.login_shine():
+        if not self._refresh_token():
             self.log.error("Authorization token has expired. "
                            "Failed to login to Shine API")
             raise RuntimeError
 
-        self.log.debug(f"Battery charging mode: {mode}")
-        try:
-            target_charge_current = CHARGE_MODES[mode]
-        except (KeyError, TypeError):
+        self.log.debug("Battery charging mode: %s", mode)
+        target_charge_current = CHARGE_MODES.get(mode)
+        if target_charge_current is None:
             self.log.error(f"{mode} charge mode unknown")
             raise AttributeError
 
         self.log.debug("Getting battery charge current value")
-        if not self.get_setting_value(inverter, "battery_charge_current"):
+        setting_value = self._request_setting_value(inverter,
+                                                    "battery_charge_current")
+        if setting_value is None:
             self.log.error("Getting battery charge current failed")
             raise RuntimeError
 
-        setting_charge_current = self.setting_value/10
-        self.setting_value = None
-        self.log.debug("Battery charge current value: "
-                       f"{setting_charge_current} A")
+        setting_charge_current = setting_value/10
+        self.log.debug("Battery charge current value: %s A",
+                       setting_charge_current)
 
         if setting_charge_current == target_charge_current:
             self.log.info("Correct charge current value is already set. "
@@ -226,15 +256,22 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
             self.log.error("Failed to set battery charge current")
             raise RuntimeError
 
-        if not self.get_setting_value(inverter, "battery_charge_current"):
+        # The command status already confirms that the value was applied
+        if not os.getenv("SHINE_VERIFY_SETTINGS"):
+            self.scheduler_list_jobs()
+            self.log.info("Battery charging optimization was successful")
+            return True
+
+        setting_value = self._request_setting_value(inverter,
+                                                    "battery_charge_current")
+        if setting_value is None:
             self.log.error("Getting battery charge current failed "
                            "(Validation)")
             raise RuntimeError
 
-        setting_charge_current = self.setting_value/10
-        self.setting_value = None
-        self.log.debug("Battery charge current value: "
-                       f"{setting_charge_current} A")
+        setting_charge_current = setting_value/10
+        self.log.debug("Battery charge current value: %s A",
+                       setting_charge_current)
 
         if not setting_charge_current == target_charge_current:
             self.log.error("Failed to set battery charge current. "
@@ -261,21 +298,21 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
             RuntimeError: If there is an issue with authorization, or if
                           retrieving the battery state of charge fails.
         """
-        time_now = datetime.now().timestamp()
+        time_now = time.time()
         self.log.debug("Checking if token is valid")
-        if self.token_ttl < time_now and not self.login_shine():
+        if not self._refresh_token():
             self.log.error("Authorization token has expired. "
                            "Failed to login to Shine API")
             raise RuntimeError
 
         self.log.debug("Getting battery state of charge")
-        if not self.get_device_value(inverter, "battery_soc"):
+        device_value = self._request_device_value(inverter, "battery_soc")
+        if device_value is None:
             self.log.error("Getting battery state of charge failed")
             raise RuntimeError
 
-        soc_value = float(self.device_value)
-        self.device_value = None
-        self.log.debug(f"Battery SOC: {soc_value}%")
+        soc_value = float(device_value)
+        self.log.debug("Battery SOC: %s%%", soc_value)
 
         if soc_value < 50:
             self.log.info("Battery needs to be charge before optimization")
@@ -326,7 +363,7 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
             self.log.error("RCE minimal price price not set")
             return False
 
-        if not hasattr(self, "inverters") or not self.inverters:
+        if not self.inverters:
             self.log.error("No inverter list found")
             return False
 
@@ -335,8 +372,9 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
         else:
             charging_mode = "normal_charge"
 
-        time_now = datetime.now().timestamp()
-        if time_now > self.optim_date.timestamp():
+        time_now = time.time()
+        optim_ts = self.optim_date.timestamp()
+        if time_now > optim_ts:
             self.log.warning("Optimization time was missed")
             self.optim = False
             self.soc_check_date = None
@@ -344,14 +382,18 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
             return True
 
         if time_now > self.soc_check_date.timestamp():
-            self.soc_check_date = (datetime.fromtimestamp(time_now) +
-                                   timedelta(seconds=30))
+            self.soc_check_date = datetime.fromtimestamp(time_now + 30)
+
+        soc_check = self.soc_check_date.timestamp() <= optim_ts - 180
+        eod_charge = (self.weather_data["sunrise_time"] <
+                      self.weather_data["sunset_time"])
+        if eod_charge:
+            eod_date = datetime.fromtimestamp(self.weather_data["sunset_time"])
 
         for inverter in self.inverters:
-            self.log.info("Setting optimization strategy for inverter nr"
-                          f" {inverter}")
-            if not (self.soc_check_date.timestamp() >
-                    (self.optim_date.timestamp()-180)):
+            self.log.info("Setting optimization strategy for inverter nr %s",
+                          inverter)
+            if soc_check:
                 self.scheduler.add_job(
                     self.optim_soc_check,
                     trigger="date",
@@ -368,14 +410,11 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
                 replace_existing=True,
                 kwargs={"inverter": inverter, "mode": charging_mode}
             )
-            if not (self.weather_data["sunrise_time"] >=
-                    self.weather_data["sunset_time"]):
+            if eod_charge:
                 self.scheduler.add_job(
                     self.optim_charge_battery,
                     trigger="date",
-                    run_date=datetime.fromtimestamp(
-                        self.weather_data["sunset_time"]
-                    ),
+                    run_date=eod_date,
                     id=f"eod_charge_battery_inv_{inverter}",
                     replace_existing=True,
                     kwargs={
@@ -399,10 +438,8 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
         if not self._get_judge_factors():
             self.log.warning("Failed to get judge factors")
             self.judge_date += timedelta(minutes=30)
-            self.log.info(
-                "Rescheduling optimization judge to "
-                f"{self.judge_date.strftime('%d-%m-%Y %H:%M')}"
-            )
+            self.log.info("Rescheduling optimization judge to %s",
+                          self.judge_date.strftime("%d-%m-%Y %H:%M"))
             self.scheduler.add_job(
                 self.optim_judge,
                 trigger="date",
@@ -411,12 +448,11 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
                 replace_existing=True)
             raise RuntimeError
 
-        if self.judge_date.timestamp() > self.weather_data["sunrise_time"]:
+        sunrise_time = self.weather_data["sunrise_time"]
+        if self.judge_date.timestamp() > sunrise_time:
             self.soc_check_date = self.judge_date + timedelta(minutes=2)
         else:
-            self.soc_check_date = datetime.fromtimestamp(
-                self.weather_data["sunrise_time"]
-            )
+            self.soc_check_date = datetime.fromtimestamp(sunrise_time)
 
         if self.not_cloudy:
             # https://www.youtube.com/watch?v=-Hv8fj8hQlE
@@ -430,22 +466,17 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
             self.optim_date = None
             self.soc_check_date = None
 
-        self.log.debug(f"Optim flag: {self.optim}")
-        self.log.debug(f"Optim date: {self.optim_date}")
-        self.log.debug(f"State of charge check date: {self.soc_check_date}")
+        self.log.debug("Optim flag: %s", self.optim)
+        self.log.debug("Optim date: %s", self.optim_date)
+        self.log.debug("State of charge check date: %s",
+                       self.soc_check_date)
         self.log.info("Setting up optimization strategy")
         if not self._optim_strategy():
             self.log.error("Setting optimization strategy failed")
             raise RuntimeError
 
         self.log.info("Scheduling tomorrow's optimization judge")
-        # Based on publication dates tomorrow 4:06AM UTC
-
-        self.judge_date = (
-            datetime.now().astimezone(ZoneInfo("UTC")).replace(
-                hour=4, minute=6, second=0, microsecond=0
-            ) + timedelta(days=1)
-        )
+        self.judge_date = self._next_judge_date()
         self.scheduler.add_job(
             self.optim_judge,
             trigger="date",
@@ -455,6 +486,42 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
         )
         self.scheduler_list_jobs()
 
+    def _next_judge_date(self):
+        """
+        Gets the date of the next optimization judge. The judge runs daily
+        at 4:06 AM UTC, after the RCE prices and forecasts are published.
+
+        Returns:
+            datetime: The next judge date in UTC.
+        """
+        time_now = datetime.now().astimezone(UTC)
+        judge_date = time_now.replace(
+            hour=4, minute=6, second=0, microsecond=0
+        )
+        if time_now > judge_date:
+            judge_date += timedelta(days=1)
+        return judge_date
+
+    def _get_watchdog_interval(self):
+        """
+        Gets the systemd watchdog notification interval. The watchdog is
+        notified twice per WATCHDOG_USEC period, as systemd recommends.
+
+        Returns:
+            float: The notification interval in seconds.
+        """
+        watchdog_usec = os.getenv("WATCHDOG_USEC")
+        if not watchdog_usec:
+            return WATCHDOG_INTERVAL
+        try:
+            watchdog_interval = int(watchdog_usec) / 2e6
+        except ValueError:
+            watchdog_interval = 0
+        if watchdog_interval <= 0:
+            self.log.warning(f"Wrong WATCHDOG_USEC value: {watchdog_usec}")
+            return WATCHDOG_INTERVAL
+        return watchdog_interval
+
     def optim_main(self):
         """
         Main function to set up and schedule the optimization judge.
@@ -464,15 +531,10 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
         """
         self._shine_setup()
 
-        time_now = datetime.now().astimezone(ZoneInfo("UTC"))
-        self.judge_date = time_now.replace(
-            hour=4, minute=6, second=0, microsecond=0
-        )
-        if time_now.timestamp() > self.judge_date.timestamp():
-            self.judge_date += timedelta(days=1)
+        self.judge_date = self._next_judge_date()
 
-        self.log.info("Scheduling optimization judge to "
-                      f"{self.judge_date.strftime('%d-%m-%Y %H:%M')}")
+        self.log.info("Scheduling optimization judge to %s",
+                      self.judge_date.strftime("%d-%m-%Y %H:%M"))
         self.scheduler.add_job(
             self.optim_judge,
             trigger="date",
@@ -481,9 +543,13 @@ class OptimShine(OptimConfig, ApiPse, ApiShine, ApiWeather):
         )
         self.scheduler.start()
 
+        watchdog_interval = self._get_watchdog_interval()
         while self.scheduler.get_jobs() or self.running_jobs:
             self.notifier.notify("WATCHDOG=1")
-            time.sleep(5)
+            # Jobs are checked again only after the last one has finished
+            while not self._jobs_done.wait(watchdog_interval):
+                self.notifier.notify("WATCHDOG=1")
+            self._jobs_done.clear()
 
         self.scheduler.shutdown()
         self.log.critical("No jobs scheduled. Exiting...")
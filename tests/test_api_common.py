@@ -7,14 +7,16 @@
 
 import datetime
 import io
+import os
+import tempfile
 import unittest
 import logging
+import requests
 
 import optimshine.api_common as api
 import optimshine.optim_config as config
 
 from freezegun import freeze_time
-from requests.exceptions import JSONDecodeError as RequestsJSONDecodeError
 from unittest.mock import patch
 
 
@@ -28,12 +30,44 @@ class TestApiShine(unittest.TestCase):
     def tearDown(self):
         self.log.handlers.clear()
 
-    @patch("requests.post")
-    def test_api_post_request(self, mock_post):
+    def test_session_setup(self):
+        cls_common_api = api.ApiCommon(self.log)
+
+        self.assertTrue(hasattr(cls_common_api, "session"))
+        for header, value in api.HEADERS.items():
+            self.assertEqual(cls_common_api.session.headers[header], value)
+        adapter = cls_common_api.session.get_adapter("https://test_url")
+        self.assertEqual(adapter._pool_maxsize, 10)
+
+    @patch("requests.Session.close")
+    def test_close(self, mock_close):
+        cls_common_api = api.ApiCommon(self.log)
+        cls_common_api.close()
+
+        mock_close.assert_called_once()
+
+    @patch("requests.Session.post")
+    def test_api_post_request_no_token(self, mock_post):
         mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = (
-            {"data": "Success"}
+        mock_post.return_value.content = b'{"data": "Success"}'
+
+        cls_common_api = api.ApiCommon(self.log)
+        response = cls_common_api.api_post_request(
+            "test_url",
+            {"test_request": "request"},
         )
+        self.assertEqual(response, {"data": "Success"})
+        mock_post.assert_called_once_with(
+            "test_url",
+            data=b'{"test_request":"request"}',
+            headers=None,
+            timeout=api.API_TIMEOUT
+        )
+
+    @patch("requests.Session.post")
+    def test_api_post_request(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = b'{"data": "Success"}'
 
         cls_common_api = api.ApiCommon(self.log)
         response = cls_common_api.api_post_request(
@@ -43,13 +77,13 @@ class TestApiShine(unittest.TestCase):
         )
         self.assertEqual(response, {"data": "Success"})
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_api_post_request_wrong_json_response(self, mock_post):
         stdio = io.StringIO()
         mock_post.return_value.status_code = 200
         mock_post.return_value.text = '{},"fstart":"2025-06-03T00:00:00Z"}'
-        mock_post.return_value.json.side_effect = (
-            RequestsJSONDecodeError("Expecting value", "doc", 0)
+        mock_post.return_value.content = (
+            mock_post.return_value.text.encode()
         )
 
         handler = logging.StreamHandler(stream=stdio)
@@ -66,7 +100,7 @@ class TestApiShine(unittest.TestCase):
         self.assertIn("Failed to decode response message. Response: "
                       f"{mock_post.return_value.text}", stdout)
 
-    @patch("requests.post")
+    @patch("requests.Session.post")
     def test_user_login_status_code(self, mock_post):
         stdio = io.StringIO()
         mock_post.return_value.status_code = 501
@@ -85,24 +119,59 @@ class TestApiShine(unittest.TestCase):
         self.assertIsNone(response)
         self.assertIn("API post failed. Status code 501", stdout)
 
-    @patch("requests.get")
-    def test_api_get_request(self, mock_get):
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = (
-            {"data": "Success"}
+    @patch("requests.Session.post")
+    def test_api_post_request_timeout(self, mock_post):
+        stdio = io.StringIO()
+        mock_post.side_effect = requests.Timeout("read timed out")
+
+        handler = logging.StreamHandler(stream=stdio)
+        self.log.addHandler(handler)
+
+        cls_common_api = api.ApiCommon(self.log)
+        response = cls_common_api.api_post_request(
+            "test_url",
+            {"test_request": "request"},
+            "test_token"
         )
+        stdout = stdio.getvalue()
+
+        self.assertIsNone(response)
+        self.assertIn("API post failed. read timed out", stdout)
+
+    @patch("requests.Session.get")
+    def test_api_get_request_timeout(self, mock_get):
+        stdio = io.StringIO()
+        mock_get.side_effect = requests.Timeout("read timed out")
+
+        handler = logging.StreamHandler(stream=stdio)
+        self.log.addHandler(handler)
 
         cls_common_api = api.ApiCommon(self.log)
         response = cls_common_api.api_get_request("test_url")
+        stdout = stdio.getvalue()
+
+        self.assertIsNone(response)
+        self.assertIn("API get failed. read timed out", stdout)
+
+    @patch("requests.Session.get")
+    def test_api_get_request(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.content = b'{"data": "Success"}'
+
+        cls_common_api = api.ApiCommon(self.log)
+        response = cls_common_api.api_get_request("test_url",
+                                                  params={"test": "param"})
         self.assertEqual(response, {"data": "Success"})
+        mock_get.assert_called_once_with("test_url", params={"test": "param"},
+                                         timeout=api.API_TIMEOUT)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_api_get_request_wrong_json_response(self, mock_get):
         stdio = io.StringIO()
         mock_get.return_value.status_code = 200
         mock_get.return_value.text = '{},"fstart":"2025-06-03T00:00:00Z"}'
-        mock_get.return_value.json.side_effect = (
-            RequestsJSONDecodeError("Expecting value", "doc", 0)
+        mock_get.return_value.content = (
+            mock_get.return_value.text.encode()
         )
 
         handler = logging.StreamHandler(stream=stdio)
@@ -115,7 +184,27 @@ class TestApiShine(unittest.TestCase):
         self.assertIn("Failed to decode response message. Response: "
                       f"{mock_get.return_value.text}", stdout)
 
-    @patch("requests.get")
+    @patch("requests.Session.post")
+    def test_api_post_request_no_content(self, mock_post):
+        stdio = io.StringIO()
+        mock_post.return_value.status_code = 204
+        mock_post.return_value.content = b""
+
+        handler = logging.StreamHandler(stream=stdio)
+        self.log.addHandler(handler)
+
+        cls_common_api = api.ApiCommon(self.log)
+        response = cls_common_api.api_post_request(
+            "test_url",
+            {"test_request": "request"},
+            "test_token"
+        )
+        stdout = stdio.getvalue()
+
+        self.assertIsNone(response)
+        self.assertIn("API post failed. Status code 204", stdout)
+
+    @patch("requests.Session.get")
     def test_api_get_request_status_code(self, mock_get):
         mock_get.return_value.status_code = 501
 
@@ -123,6 +212,66 @@ class TestApiShine(unittest.TestCase):
         response = cls_common_api.api_get_request("test_url")
         self.assertIsNone(response)
 
+    def test_cache_write_read(self):
+        cls_common_api = api.ApiCommon(self.log)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with patch("optimshine.api_common.CACHE_DIR", cache_dir):
+                status = cls_common_api.cache_write("test.json",
+                                                    {"data": "Success"})
+                data = cls_common_api.cache_read("test.json")
+                mode = os.stat(os.path.join(cache_dir, "test.json")).st_mode
+
+        self.assertTrue(status)
+        self.assertEqual(data, {"data": "Success"})
+        self.assertEqual(mode & 0o777, 0o600)
+
+    def test_cache_read_no_file(self):
+        cls_common_api = api.ApiCommon(self.log)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with patch("optimshine.api_common.CACHE_DIR", cache_dir):
+                data = cls_common_api.cache_read("test.json")
+
+        self.assertIsNone(data)
+
+    def test_cache_read_wrong_data(self):
+        cls_common_api = api.ApiCommon(self.log)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with open(os.path.join(cache_dir, "test.json"), "w") as f:
+                f.write('{},"wrong"}')
+            with patch("optimshine.api_common.CACHE_DIR", cache_dir):
+                data = cls_common_api.cache_read("test.json")
+
+        self.assertIsNone(data)
+
+    def test_cache_read_ttl(self):
+        cls_common_api = api.ApiCommon(self.log)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, "test.json")
+            with open(cache_path, "w") as f:
+                f.write('{"data": "Success"}')
+            with patch("optimshine.api_common.CACHE_DIR", cache_dir):
+                fresh_data = cls_common_api.cache_read("test.json", ttl=60)
+                os.utime(cache_path, (0, 0))
+                expired_data = cls_common_api.cache_read("test.json", ttl=60)
+
+        self.assertEqual(fresh_data, {"data": "Success"})
+        self.assertIsNone(expired_data)
+
+    def test_cache_write_failed(self):
+        stdio = io.StringIO()
+        handler = logging.StreamHandler(stream=stdio)
+        self.log.addHandler(handler)
+
+        cls_common_api = api.ApiCommon(self.log)
+        with tempfile.NamedTemporaryFile() as cache_file:
+            with patch("optimshine.api_common.CACHE_DIR", cache_file.name):
+                status = cls_common_api.cache_write("test.json",
+                                                    {"data": "Success"})
+        stdout = stdio.getvalue()
+
+        self.assertFalse(status)
+        self.assertIn("Writing test.json cache failed.", stdout)
+
     @freeze_time("2025-05-15 00:55:00")
     def test_get_request_time_no_delta(self, ):
         cls_common_api = api.ApiCommon(self.log)
@@ -5,8 +5,11 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 #
 
+import datetime
 import io
 import logging
+import os
+import tempfile
 import unittest
 
 import optimshine.api_pse as api
@@ -21,9 +24,15 @@ class TestPseApi(unittest.TestCase):
         cls_optim_config.logger_setup()
         self.log = cls_optim_config.log
         cls_optim_config.envs_setup("tests/.testenv")
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_patcher = patch("optimshine.api_common.CACHE_DIR",
+                                   self.cache_dir.name)
+        self.cache_patcher.start()
 
     def tearDown(self):
         self.log.handlers.clear()
+        self.cache_patcher.stop()
+        self.cache_dir.cleanup()
 
     @patch("optimshine.api_common.ApiCommon.api_get_request")
     def test_get_pse_data_none_response(self, mock_api_get_request):
@@ -105,21 +114,85 @@ class TestPseApi(unittest.TestCase):
             ]
         }
         expected_date = "2025-05-14"
-        expected_prices = {
-            "2025-06-16 00:15:00": 439.58,
-            "2025-06-16 00:30:00": 449.58,
-            "2025-06-16 00:45:00": 459.58,
-        }
+        expected_prices = [
+            (1750024800, 439.58),
+            (1750024800, 449.58),
+            (1750024800, 459.58),
+        ]
 
         cls_api_pse = api.ApiPse(self.log)
         status = cls_api_pse.get_pse_data("2025-05-14")
 
         self.assertTrue(status)
+        mock_api_get_request.assert_called_once_with(
+            api.PSE_RCE_URL,
+            params="$filter=business_date%20eq%20%272025-05-14%27"
+        )
         self.assertTrue(hasattr(cls_api_pse, "rce_date"))
         self.assertEqual(expected_date, cls_api_pse.rce_date)
         self.assertTrue(hasattr(cls_api_pse, "rce_prices"))
         self.assertEqual(expected_prices, cls_api_pse.rce_prices)
 
+    @patch("optimshine.api_common.ApiCommon.api_get_request")
+    def test_get_pse_data_cached(self, mock_api_get_request):
+        stdio = io.StringIO()
+        handler = logging.StreamHandler(stream=stdio)
+        self.log.addHandler(handler)
+        mock_api_get_request.return_value = {
+            "value": [
+                {"dtime": "2025-05-14 00:15:00", "rce_pln": 439.58},
+            ]
+        }
+
+        cls_api_pse = api.ApiPse(self.log)
+        first_status = cls_api_pse.get_pse_data("2025-05-14")
+        cls_api_pse.rce_prices = None
+        second_status = cls_api_pse.get_pse_data("2025-05-14")
+        stdout = stdio.getvalue()
+
+        self.assertTrue(first_status)
+        self.assertTrue(second_status)
+        mock_api_get_request.assert_called_once()
+        self.assertEqual(cls_api_pse.rce_prices, [(1747173600, 439.58)])
+        self.assertEqual(cls_api_pse.cache_read(api.PSE_CACHE_NAME), {
+            "date": "2025-05-14",
+            "rce_quarters": {"2025-05-14 00:15:00": 439.58},
+        })
+        self.assertIn("RCE data for 2025-05-14 read from cache.", stdout)
+
+    @patch("optimshine.api_common.ApiCommon.api_get_request")
+    def test_get_pse_data_cached_other_date(self, mock_api_get_request):
+        mock_api_get_request.return_value = {
+            "value": [
+                {"dtime": "2025-05-14 00:15:00", "rce_pln": 439.58},
+            ]
+        }
+
+        cls_api_pse = api.ApiPse(self.log)
+        cls_api_pse.get_pse_data("2025-05-14")
+        cls_api_pse.get_pse_data("2025-05-15")
+
+        self.assertEqual(mock_api_get_request.call_count, 2)
+        self.assertEqual(os.listdir(self.cache_dir.name),
+                         [api.PSE_CACHE_NAME])
+
+    @patch("optimshine.api_common.ApiCommon.api_get_request")
+    def test_get_pse_data_today_cache_expired(self, mock_api_get_request):
+        date = datetime.date.today().isoformat()
+        mock_api_get_request.return_value = {
+            "value": [
+                {"dtime": f"{date} 00:15:00", "rce_pln": 439.58},
+            ]
+        }
+
+        cls_api_pse = api.ApiPse(self.log)
+        cls_api_pse.get_pse_data(date)
+        os.utime(os.path.join(self.cache_dir.name, api.PSE_CACHE_NAME),
+                 (0, 0))
+        cls_api_pse.get_pse_data(date)
+
+        self.assertEqual(mock_api_get_request.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
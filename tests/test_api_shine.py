@@ -8,6 +8,8 @@
 import io
 import os
 import logging
+import tempfile
+import time
 import unittest
 
 import optimshine.api_shine as api
@@ -24,9 +26,15 @@ class TestApiShine(unittest.TestCase):
         cls_optim_config.logger_setup()
         self.log = cls_optim_config.log
         cls_optim_config.envs_setup("tests/.testenv")
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_patcher = patch("optimshine.api_common.CACHE_DIR",
+                                   self.cache_dir.name)
+        self.cache_patcher.start()
 
     def tearDown(self):
         self.log.handlers.clear()
+        self.cache_patcher.stop()
+        self.cache_dir.cleanup()
 
     def test_get_shine_api_url_wrong_endpoint(self):
         stdio = io.StringIO()
@@ -41,6 +49,13 @@ class TestApiShine(unittest.TestCase):
         self.assertIsNone(result)
         self.assertIn("wrong_endpoint API endpoint not found!", stdout)
 
+    def test_get_shine_api_url(self):
+        cls_api_shine = api.ApiShine(self.log)
+
+        result = cls_api_shine._get_shine_api_url("login")
+
+        self.assertEqual(result, f"{api.SHINE_API_URL}/userlogin")
+
     @patch("optimshine.api_common.ApiCommon.api_post_request")
     def test_user_login(self, mock_api_post_request):
         mock_api_post_request.return_value = (
@@ -55,6 +70,90 @@ class TestApiShine(unittest.TestCase):
         self.assertEqual(cls_api_shine.token_ttl, 1748987050)
         self.assertTrue(result)
 
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_user_login_token_cached(self, mock_api_post_request):
+        mock_api_post_request.return_value = (
+            {"data": {"token": api_data.test_token}}
+        )
+
+        cls_api_shine = api.ApiShine(self.log)
+        cls_api_shine.login_shine()
+        cached_token = cls_api_shine.cache_read(api.SHINE_TOKEN_CACHE)
+
+        self.assertEqual(cached_token["user"], os.getenv("SHINE_USER"))
+        self.assertEqual(cached_token["token"], api_data.test_token)
+        self.assertEqual(cached_token["token_ttl"], 1748987050)
+
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_user_login_cached_token_reused(self, mock_api_post_request):
+        stdio = io.StringIO()
+        handler = logging.StreamHandler(stream=stdio)
+        self.log.addHandler(handler)
+        token_ttl = int(time.time()) + 3600
+
+        cls_api_shine = api.ApiShine(self.log)
+        cls_api_shine.cache_write(api.SHINE_TOKEN_CACHE, {
+            "user": os.getenv("SHINE_USER"),
+            "token": "cached_token",
+            "token_ttl": token_ttl,
+        })
+        result = cls_api_shine.login_shine()
+        stdout = stdio.getvalue()
+
+        self.assertTrue(result)
+        self.assertEqual(cls_api_shine.token, "cached_token")
+        self.assertEqual(cls_api_shine.token_ttl, token_ttl)
+        self.assertIn("Valid login token found in cache.", stdout)
+        mock_api_post_request.assert_not_called()
+
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_user_login_cached_token_other_user(self, mock_api_post_request):
+        mock_api_post_request.return_value = (
+            {"data": {"token": api_data.test_token}}
+        )
+
+        cls_api_shine = api.ApiShine(self.log)
+        cls_api_shine.cache_write(api.SHINE_TOKEN_CACHE, {
+            "user": "other_user",
+            "token": "cached_token",
+            "token_ttl": int(time.time()) + 3600,
+        })
+        result = cls_api_shine.login_shine()
+
+        self.assertTrue(result)
+        self.assertEqual(cls_api_shine.token, api_data.test_token)
+        mock_api_post_request.assert_called_once()
+
+    def test_get_token_expiry(self):
+        cls_api_shine = api.ApiShine(self.log)
+
+        self.assertEqual(
+            cls_api_shine._get_token_expiry(api_data.test_token),
+            1748987050
+        )
+        self.assertIsNone(cls_api_shine._get_token_expiry("Bearer_wrong"))
+        self.assertIsNone(cls_api_shine._get_token_expiry("Bearer_a.!!!.c"))
+
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_user_login_wrong_token(self, mock_api_post_request):
+        stdio = io.StringIO()
+        handler = logging.StreamHandler(stream=stdio)
+        self.log.addHandler(handler)
+        mock_api_post_request.return_value = (
+            {"data": {"token": "Bearer_wrong"}}
+        )
+
+        cls_api_shine = api.ApiShine(self.log)
+        cls_api_shine.token = "Bearer_old"
+        cls_api_shine.token_ttl = 1
+        result = cls_api_shine.login_shine()
+        stdout = stdio.getvalue()
+
+        self.assertFalse(result)
+        self.assertIn("Cannot read login token expiry.", stdout)
+        self.assertEqual(cls_api_shine.token, "Bearer_old")
+        self.assertEqual(cls_api_shine.token_ttl, 0)
+
     @patch("optimshine.api_common.ApiCommon.api_post_request")
     def test_user_login_wrong_password(self, mock_api_post_request):
         stdio = io.StringIO()
@@ -585,6 +684,52 @@ class TestApiShine(unittest.TestCase):
         self.assertFalse(result)
         self.assertIn("Command timeout!", stdout)
 
+    @patch("optimshine.api_shine.time.sleep")
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_setting_command_status_backoff(self, mock_api_post_request,
+                                            mock_sleep):
+        mock_api_post_request.side_effect = [
+            {"data": {"result": 0}},
+            {"data": {"result": 0}},
+            {"data": {"result": 0}},
+            {"data": {"result": 1}},
+        ]
+
+        cls_api_shine = api.ApiShine(self.log)
+        cls_api_shine.token = "test"
+        result = cls_api_shine._setting_command_status("test", 10)
+
+        self.assertTrue(result)
+        self.assertEqual(mock_api_post_request.call_count, 4)
+        delays = [round(c.args[0], 1) for c in mock_sleep.call_args_list]
+        self.assertEqual(delays, [0.1, 0.2, 0.4])
+
+    @patch("optimshine.api_shine.time")
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_setting_command_status_deadline(self, mock_api_post_request,
+                                             mock_time):
+        clock = [0.0]
+
+        def fake_sleep(seconds):
+            clock[0] += seconds
+
+        def fake_post(*_):
+            # Every status request takes 0.7 s
+            clock[0] += 0.7
+            return {"data": {"result": 0}}
+
+        mock_time.monotonic.side_effect = lambda: clock[0]
+        mock_time.sleep.side_effect = fake_sleep
+        mock_api_post_request.side_effect = fake_post
+
+        cls_api_shine = api.ApiShine(self.log)
+        cls_api_shine.token = "test"
+        result = cls_api_shine._setting_command_status("test", 2)
+
+        self.assertFalse(result)
+        self.assertEqual(mock_api_post_request.call_count, 3)
+        self.assertLessEqual(clock[0], 2 + 0.7)
+
     @patch("optimshine.api_common.ApiCommon.api_post_request")
     def test_setting_command_status_pass(self, mock_api_post_request):
         stdio = io.StringIO()
@@ -681,6 +826,32 @@ class TestApiShine(unittest.TestCase):
         self.assertTrue(result)
         self.assertIn("Charge current successfuly set.", stdout)
 
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    @patch("optimshine.api_shine.ApiShine._setting_command_status")
+    def test_set_charge_current_request(self, mock_setting_command_status,
+                                        mock_api_post_request):
+        mock_api_post_request.return_value = {"data": [{"id": "test"}]}
+        mock_setting_command_status.return_value = True
+
+        cls_api_shine = api.ApiShine(self.log)
+        cls_api_shine.token = "test"
+        cls_api_shine.set_charge_current("test_sn", 60)
+        request = mock_api_post_request.call_args.args[1]
+
+        self.assertEqual(request["deviceSn"], "test_sn")
+        self.assertEqual(request["timeZone"], "Europe/Warsaw")
+        self.assertIn("timestamp", request)
+        self.assertEqual(request["deviceCommands"], [{
+            "dataHandlerType": 0,
+            "fieldName": "bmchc",
+            "groupId": 0,
+            "paramType": 0,
+            "useType": 3,
+            "fieldValue": "60.0",
+        }])
+        self.assertEqual(request["realContentParam"], ["bmchc"])
+        self.assertNotIn("fieldValue", api.SHINE_CHARGE_CURRENT_COMMAND)
+
     def test_get_device_value_not_authorized(self):
         stdio = io.StringIO()
         handler = logging.StreamHandler(stream=stdio)
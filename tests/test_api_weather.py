@@ -22,6 +22,7 @@ class TestPseApi(unittest.TestCase):
         cls_optim_config.logger_setup()
         self.log = cls_optim_config.log
         cls_optim_config.envs_setup("tests/.testenv")
+        api._sunrise_cache.clear()
 
     def tearDown(self):
         self.log.handlers.clear()
@@ -33,6 +34,22 @@ class TestPseApi(unittest.TestCase):
 
         self.assertEqual(timestamp, 1744596000)
 
+    def test_get_timestamp_hour_am_pm(self):
+        cls_api_weather = api.ApiWeather(self.log)
+
+        self.assertEqual(
+            cls_api_weather.get_timestamp_hour("2025-04-14", "12:00:00 AM"),
+            1744588800
+        )
+        self.assertEqual(
+            cls_api_weather.get_timestamp_hour("2025-04-14", "12:59:59 PM"),
+            1744632000
+        )
+        self.assertEqual(
+            cls_api_weather.get_timestamp_hour("2025-04-14", "11:30:00 PM"),
+            1744671600
+        )
+
     @patch("optimshine.api_common.ApiCommon.api_get_request")
     def test_get_solar_sunrise_sunset_time_none_response(self,
                                                          mock_api_get_request):
@@ -91,12 +108,56 @@ class TestPseApi(unittest.TestCase):
         self.assertTrue(hasattr(cls_api_weather, "sunset"))
         self.assertEqual(cls_api_weather.sunrise, "2:29:57 AM")
         self.assertEqual(cls_api_weather.sunset, "6:53:59 PM")
+        mock_api_get_request.assert_called_once_with(
+            api.SUNRISE_URL,
+            {"lat": "36.7201600", "lng": "-33.86882", "date": "2025-04-14"}
+        )
+
+    @patch("optimshine.api_common.ApiCommon.api_get_request")
+    def test_get_solar_sunrise_sunset_time_cached(self,
+                                                  mock_api_get_request):
+        mock_api_get_request.return_value = api_data.sunrise_response
+
+        cls_api_weather = api.ApiWeather(self.log)
+        for _ in range(2):
+            status = cls_api_weather._get_solar_sunrise_sunset_time(
+                "36.7201600",
+                "-33.86882",
+                "2025-04-14"
+            )
+            self.assertTrue(status)
+
+        self.assertEqual(cls_api_weather.sunrise, "2:29:57 AM")
+        self.assertEqual(cls_api_weather.sunset, "6:53:59 PM")
+        mock_api_get_request.assert_called_once()
+
+    @patch("optimshine.api_common.ApiCommon.api_get_request")
+    def test_get_solar_sunrise_sunset_time_failure_not_cached(
+        self,
+        mock_api_get_request
+    ):
+        mock_api_get_request.side_effect = [None, api_data.sunrise_response]
+
+        cls_api_weather = api.ApiWeather(self.log)
+        self.assertFalse(cls_api_weather._get_solar_sunrise_sunset_time(
+            "36.7201600",
+            "-33.86882",
+            "2025-04-14"
+        ))
+        self.assertTrue(cls_api_weather._get_solar_sunrise_sunset_time(
+            "36.7201600",
+            "-33.86882",
+            "2025-04-14"
+        ))
+        self.assertEqual(mock_api_get_request.call_count, 2)
 
     @patch("optimshine.api_weather.ApiWeather._get_solar_sunrise_sunset_time")
-    def test_get_weather_data_sunset_false(self,
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_get_weather_data_sunset_false(self, mock_api_post_request,
                                            mock_api_weather):
         stdio = io.StringIO()
         mock_api_weather.return_value = False
+        mock_api_post_request.return_value = None
 
         handler = logging.StreamHandler(stream=stdio)
         self.log.addHandler(handler)
@@ -110,10 +171,12 @@ class TestPseApi(unittest.TestCase):
         self.assertIn("Error during obtaining sunrise or sunset", stdout)
 
     @patch("optimshine.api_weather.ApiWeather._get_solar_sunrise_sunset_time")
-    def test_get_weather_data_sunset_none(self,
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_get_weather_data_sunset_none(self, mock_api_post_request,
                                           mock_api_weather):
         stdio = io.StringIO()
         mock_api_weather.return_value = True
+        mock_api_post_request.return_value = None
 
         handler = logging.StreamHandler(stream=stdio)
         self.log.addHandler(handler)
@@ -345,5 +408,28 @@ class TestPseApi(unittest.TestCase):
         )
 
 
+    @patch("optimshine.api_weather.ThreadPoolExecutor")
+    @patch("optimshine.api_common.ApiCommon.api_get_request")
+    @patch("optimshine.api_common.ApiCommon.api_post_request")
+    def test_get_weather_data_sunrise_cached_no_pool(self,
+                                                     mock_api_post_request,
+                                                     mock_api_get_request,
+                                                     mock_executor):
+        api._sunrise_cache[("36.7201600", "-33.86882", "2025-05-20")] = (
+            "2:29:57 AM",
+            "10:29:57 PM"
+        )
+        mock_api_post_request.return_value = api_data.devmgramapi_response
+
+        cls_api_weather = api.ApiWeather(self.log)
+        status = cls_api_weather.get_weather_data("36.7201600",
+                                                  "-33.86882",
+                                                  "2025-05-20")
+
+        self.assertTrue(status)
+        mock_executor.assert_not_called()
+        mock_api_get_request.assert_not_called()
+        mock_api_post_request.assert_called_once()
+
 if __name__ == "__main__":
     unittest.main()
@@ -18,6 +18,7 @@ from apscheduler.events import (
     EVENT_JOB_SUBMITTED,
     EVENT_JOB_MISSED,
 )
+from datetime import datetime, timedelta
 from logging import RootLogger
 from unittest.mock import call, Mock, MagicMock, patch
 from optimshine.optim_config import OptimConfig
@@ -64,6 +65,8 @@ class TestOptimConfig(unittest.TestCase):
         cl = OptimConfig()
         cl.missed_jobs = set()
         cl.running_jobs = set()
+        cl._idle = threading.Event()
+        cl._jobs_lock = threading.Lock()
         cl.missed_jobs.add("test_job_id")
         cl._job_running_listener(event)
         self.assertSetEqual(cl.missed_jobs, set())
@@ -74,8 +77,12 @@ class TestOptimConfig(unittest.TestCase):
         cl = OptimConfig()
         cl.missed_jobs = set()
         cl.running_jobs = set()
+        cl._idle = threading.Event()
+        cl._jobs_lock = threading.Lock()
+        cl._idle.set()
         cl._job_running_listener(event)
         self.assertIn("test_job_id", cl.running_jobs)
+        self.assertFalse(cl._idle.is_set())
 
     def test_job_missed_listener_running_jobs(self):
         event = Mock()
@@ -83,9 +90,12 @@ class TestOptimConfig(unittest.TestCase):
         cl = OptimConfig()
         cl.missed_jobs = set()
         cl.running_jobs = set()
+        cl._idle = threading.Event()
+        cl._jobs_lock = threading.Lock()
         cl.running_jobs.add("test_job_id")
         cl._job_missed_listener(event)
         self.assertSetEqual(cl.running_jobs, set())
+        self.assertTrue(cl._idle.is_set())
 
     def test_job_missed_listener_missed_jobs(self):
         event = Mock()
@@ -93,6 +103,8 @@ class TestOptimConfig(unittest.TestCase):
         cl = OptimConfig()
         cl.missed_jobs = set()
         cl.running_jobs = set()
+        cl._idle = threading.Event()
+        cl._jobs_lock = threading.Lock()
         cl._job_missed_listener(event)
         self.assertIn("test_job_id", cl.missed_jobs)
 
@@ -101,9 +113,12 @@ class TestOptimConfig(unittest.TestCase):
         event.job_id = "test_job_id"
         cl = OptimConfig()
         cl.running_jobs = set()
+        cl._idle = threading.Event()
+        cl._jobs_lock = threading.Lock()
         cl.running_jobs.add("test_job_id")
         cl._job_finished_listener(event)
         self.assertSetEqual(cl.running_jobs, set())
+        self.assertTrue(cl._idle.is_set())
 
     def test_job_error_listener(self):
         cl = OptimConfig()
@@ -116,10 +131,13 @@ class TestOptimConfig(unittest.TestCase):
         event.job_id = "test_job_id"
 
         cl.running_jobs = set()
+        cl._idle = threading.Event()
+        cl._jobs_lock = threading.Lock()
         cl.running_jobs.add("test_job_id")
         cl._job_error_listener(event)
         stdout = stdio.getvalue()
         self.assertSetEqual(cl.running_jobs, set())
+        self.assertTrue(cl._idle.is_set())
         self.assertIn("test_job_id job finished with error", stdout)
         cl.log.handlers.clear()
 
@@ -146,21 +164,96 @@ class TestOptimConfig(unittest.TestCase):
         cl.scheduler = Mock()
         cl.logger_setup()
         cl.running_jobs = ["test_job"]
+        cl._idle = threading.Event()
+        cl._jobs_lock = threading.Lock()
         stdio = io.StringIO()
         handler = logging.StreamHandler(stream=stdio)
         cl.log.addHandler(handler)
 
         thread = threading.Thread(target=cl._signal_handler, args=(2, ""))
         thread.start()
-        time.sleep(2)
+        time.sleep(0.5)
+        self.assertTrue(thread.is_alive())
         cl.running_jobs = []
-        thread.join()
+        cl._idle.set()
+        thread.join(timeout=1)
+        self.assertFalse(thread.is_alive())
         stdout = stdio.getvalue()
 
         cl.log.handlers.clear()
         self.assertIn("Finishing currently running jobs: ['test_job']", stdout)
+        cl.scheduler.shutdown.assert_called_once_with()
         mock_exit.assert_called_once_with(0)
 
+    def test_jobs_done_listener_jobs_scheduled(self):
+        cl = OptimConfig()
+        cl.scheduler = Mock()
+        cl.scheduler.get_jobs.return_value = ["test_job"]
+        cl.running_jobs = set()
+        cl._jobs_done = threading.Event()
+        cl._jobs_lock = threading.Lock()
+
+        cl._jobs_done_listener(Mock())
+
+        self.assertFalse(cl._jobs_done.is_set())
+
+    def test_jobs_done_listener_jobs_running(self):
+        cl = OptimConfig()
+        cl.scheduler = Mock()
+        cl.scheduler.get_jobs.return_value = []
+        cl.running_jobs = {"test_job"}
+        cl._jobs_done = threading.Event()
+        cl._jobs_lock = threading.Lock()
+
+        cl._jobs_done_listener(Mock())
+
+        self.assertFalse(cl._jobs_done.is_set())
+
+    def test_jobs_done_listener_done(self):
+        cl = OptimConfig()
+        cl.scheduler = Mock()
+        cl.scheduler.get_jobs.return_value = []
+        cl.running_jobs = set()
+        cl._jobs_done = threading.Event()
+        cl._jobs_lock = threading.Lock()
+
+        cl._jobs_done_listener(Mock())
+
+        self.assertTrue(cl._jobs_done.is_set())
+
+    @patch('optimshine.optim_config.signal')
+    def test_jobs_done_rescheduled_job(self, _):
+        cl = OptimConfig()
+        cl.logger_setup()
+        cl.scheduler_setup()
+        runs = []
+
+        def rescheduled_job():
+            time.sleep(0.1)
+            runs.append(datetime.now())
+            if len(runs) < 3:
+                cl.scheduler.add_job(
+                    rescheduled_job,
+                    trigger="date",
+                    run_date=datetime.now() + timedelta(milliseconds=100),
+                    id="test_job"
+                )
+
+        cl.scheduler.add_job(
+            rescheduled_job,
+            trigger="date",
+            run_date=datetime.now() + timedelta(milliseconds=100),
+            id="test_job"
+        )
+        cl.scheduler.start()
+        done = cl._jobs_done.wait(timeout=5)
+        runs_when_done = len(runs)
+        cl.scheduler.shutdown()
+        cl.log.handlers.clear()
+
+        self.assertTrue(done)
+        self.assertEqual(runs_when_done, 3)
+
     @patch('optimshine.optim_config.BackgroundScheduler')
     @patch('optimshine.optim_config.signal')
     def test_scheduler_setup(self, mock_signal, mock_scheduler_cls):
@@ -172,12 +265,16 @@ class TestOptimConfig(unittest.TestCase):
 
         self.assertEqual(cl.running_jobs, set())
         self.assertEqual(cl.missed_jobs, set())
+        self.assertTrue(cl._idle.is_set())
+        self.assertFalse(cl._jobs_done.is_set())
 
         expected_calls = [
             call(cl._job_running_listener, EVENT_JOB_SUBMITTED),
             call(cl._job_missed_listener, EVENT_JOB_MISSED),
             call(cl._job_finished_listener, EVENT_JOB_EXECUTED),
             call(cl._job_error_listener, EVENT_JOB_ERROR),
+            call(cl._jobs_done_listener,
+                 EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED),
         ]
 
         mock_scheduler.add_listener.assert_has_calls(expected_calls,
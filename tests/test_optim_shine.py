@@ -7,6 +7,8 @@
 
 import io
 import logging
+import threading
+import time
 import unittest
 
 from datetime import datetime, timedelta
@@ -230,6 +232,19 @@ class TestOptimShine(unittest.TestCase):
         self.assertTrue(self.cl.not_cloudy)
         self.assertTrue(status)
 
+    def test_check_weather_odd_samples(self):
+        test_date = datetime(year=2025, month=6, day=4).strftime("%Y-%m-%d")
+        self.cl.get_weather_data = MagicMock()
+        self.cl.get_weather_data.return_value = True
+
+        self.cl.weather_data = {"low_clouds_data": [0.8, 0.1, 0.2]}
+        self.assertTrue(self.cl._check_weather("0.000", "0.000", test_date))
+        self.assertTrue(self.cl.not_cloudy)
+
+        self.cl.weather_data = {"low_clouds_data": [0.1, 0.8, 0.9]}
+        self.assertTrue(self.cl._check_weather("0.000", "0.000", test_date))
+        self.assertFalse(self.cl.not_cloudy)
+
     def test_check_weather_cloudy_50_50(self):
         test_date = datetime(year=2025, month=6, day=4).strftime("%Y-%m-%d")
         self.cl.get_weather_data = MagicMock()
@@ -307,11 +322,11 @@ class TestOptimShine(unittest.TestCase):
         self.cl.plant = {"latitude": "0.0000", "longitude": "10.0000"}
         date = datetime.now().strftime("%Y-%m-%d")
         self.cl.not_cloudy = False
-        self.cl.rce_prices = {
-            "2025-05-14 00:15:00": 439.58,
-            "2025-05-14 01:30:00": 449.58,
-            "2025-05-14 02:45:00": 59.58,
-        }
+        self.cl.rce_prices = [
+            (1747173600, 439.58),
+            (1747177200, 449.58),
+            (1747180800, 59.58),
+        ]
         expected_timestamp = datetime(
             year=2025,
             month=5,
@@ -334,6 +349,69 @@ class TestOptimShine(unittest.TestCase):
         self.assertEqual(self.cl.min_price, 59.58)
         self.assertEqual(self.cl.min_price_timestamp, expected_timestamp)
 
+    def test_get_judge_factors_weather_already_obtained(self):
+        self.cl._check_weather = MagicMock()
+        self.cl.get_pse_data = MagicMock()
+        self.cl.get_pse_data.return_value = True
+        self.cl.plant = {"latitude": "0.0000", "longitude": "10.0000"}
+        date = datetime.now().strftime("%Y-%m-%d")
+        self.cl.weather_data = {"date": date}
+        self.cl.not_cloudy = True
+        self.cl.rce_prices = [(1747173600, 59.58)]
+
+        status = self.cl._get_judge_factors()
+
+        stdout = self.stdio.getvalue()
+        self.assertIn(f"Weather data for {date} already obtained", stdout)
+        self.cl._check_weather.assert_not_called()
+        self.cl.get_pse_data.assert_called_once_with(date)
+        self.assertTrue(status)
+        self.assertTrue(self.cl.not_cloudy)
+
+    def test_get_judge_factors_first_quarter_cheapest(self):
+        self.cl._check_weather = MagicMock()
+        self.cl._check_weather.return_value = True
+        self.cl.get_pse_data = MagicMock()
+        self.cl.get_pse_data.return_value = True
+        self.cl.plant = {"latitude": "0.0000", "longitude": "10.0000"}
+        self.cl.not_cloudy = False
+        self.cl.rce_prices = [
+            (1747173600, 59.58),
+            (1747177200, 449.58),
+            (1747180800, 59.58),
+        ]
+        expected_timestamp = datetime(
+            year=2025,
+            month=5,
+            day=14,
+            hour=0,
+            tzinfo=ZoneInfo("Europe/Warsaw")
+        ).timestamp()
+
+        status = self.cl._get_judge_factors()
+
+        self.assertTrue(status)
+        self.assertEqual(self.cl.min_price, 59.58)
+        self.assertEqual(self.cl.min_price_timestamp, expected_timestamp)
+
+    def test_refresh_token_concurrent_single_login(self):
+        self.cl.token_ttl = 0
+
+        def login():
+            time.sleep(0.1)
+            self.cl.token_ttl = time.time() + 3600
+            return True
+
+        self.cl.login_shine = MagicMock(side_effect=login)
+        threads = [threading.Thread(target=self.cl._refresh_token)
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        self.cl.login_shine.assert_called_once()
+
     def test_optim_charge_battery_reauthorization_failed(self):
         token_ttl_date = datetime.now() - timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
@@ -347,6 +425,16 @@ class TestOptimShine(unittest.TestCase):
                       stdout)
         self.cl.login_shine.assert_called_once()
 
+    def test_optim_charge_battery_token_refresh(self):
+        token_ttl_date = datetime.now() + timedelta(seconds=30)
+        self.cl.token_ttl = token_ttl_date.timestamp()
+        self.cl.login_shine = MagicMock()
+        self.cl.login_shine.return_value = False
+        with self.assertRaises(RuntimeError):
+            self.cl.optim_charge_battery("INV", "normal_charge")
+
+        self.cl.login_shine.assert_called_once()
+
     def test_optim_charge_battery_wrong_mode(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
@@ -360,15 +448,15 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_charge_battery_get_setting_value_failed(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_setting_value = MagicMock()
-        self.cl.get_setting_value.return_value = False
+        self.cl._request_setting_value = MagicMock()
+        self.cl._request_setting_value.return_value = None
 
         with self.assertRaises(RuntimeError):
             self.cl.optim_charge_battery("INV", "normal_charge")
 
         stdout = self.stdio.getvalue()
         self.assertIn("Getting battery charge current failed", stdout)
-        self.cl.get_setting_value.assert_called_once_with(
+        self.cl._request_setting_value.assert_called_once_with(
             "INV",
             "battery_charge_current"
         )
@@ -376,15 +464,14 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_charge_battery_same_value_pass(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_setting_value = MagicMock()
-        self.cl.get_setting_value.return_value = True
-        self.cl.setting_value = 600
+        self.cl._request_setting_value = MagicMock()
+        self.cl._request_setting_value.return_value = 600
 
         status = self.cl.optim_charge_battery("INV", "normal_charge")
 
         stdout = self.stdio.getvalue()
         self.assertIn("Correct charge current value is already set", stdout)
-        self.cl.get_setting_value.assert_called_once_with(
+        self.cl._request_setting_value.assert_called_once_with(
             "INV",
             "battery_charge_current"
         )
@@ -393,9 +480,8 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_charge_battery_set_charge_current_failed(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_setting_value = MagicMock()
-        self.cl.get_setting_value.return_value = True
-        self.cl.setting_value = 10
+        self.cl._request_setting_value = MagicMock()
+        self.cl._request_setting_value.return_value = 10
         self.cl.set_charge_current = MagicMock()
         self.cl.set_charge_current.return_value = False
 
@@ -404,7 +490,7 @@ class TestOptimShine(unittest.TestCase):
 
         stdout = self.stdio.getvalue()
         self.assertIn("Failed to set battery charge current", stdout)
-        self.cl.get_setting_value.assert_called_once_with(
+        self.cl._request_setting_value.assert_called_once_with(
             "INV",
             "battery_charge_current"
         )
@@ -413,9 +499,8 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_charge_battery_get_setting_value_validation_failed(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_setting_value = MagicMock()
-        self.cl.get_setting_value.side_effect = [True, False]
-        self.cl.setting_value = 10
+        self.cl._request_setting_value = MagicMock()
+        self.cl._request_setting_value.side_effect = [10, None]
         self.cl.set_charge_current = MagicMock()
         self.cl.set_charge_current.return_value = True
 
@@ -424,37 +509,26 @@ class TestOptimShine(unittest.TestCase):
 
         stdout = self.stdio.getvalue()
         self.assertIn("failed (Validation)", stdout)
-        self.cl.get_setting_value.assert_has_calls([
+        self.cl._request_setting_value.assert_has_calls([
             call("INV", "battery_charge_current"),
             call("INV", "battery_charge_current"),
         ])
         self.cl.set_charge_current.assert_called_once_with("INV", 60)
 
-    def side_effect_set_charge_current_10(self, _, __):
-        self.cl.setting_value = 100
-        return True
-
-    def side_effect_set_charge_current_60(self, _, __):
-        self.cl.setting_value = 600
-        return True
-
     def test_optim_charge_battery_wrong_value_afeter_set(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_setting_value = MagicMock()
-        self.cl.get_setting_value.return_value = True
-        self.cl.setting_value = 10
+        self.cl._request_setting_value = MagicMock()
+        self.cl._request_setting_value.side_effect = [10, 100]
         self.cl.set_charge_current = MagicMock()
-        self.cl.set_charge_current.side_effect = (
-            self.side_effect_set_charge_current_10
-        )
+        self.cl.set_charge_current.return_value = True
 
         with self.assertRaises(RuntimeError):
             self.cl.optim_charge_battery("INV", "normal_charge")
 
         stdout = self.stdio.getvalue()
         self.assertIn("Wrong current value", stdout)
-        self.cl.get_setting_value.assert_has_calls([
+        self.cl._request_setting_value.assert_has_calls([
             call("INV", "battery_charge_current"),
             call("INV", "battery_charge_current"),
         ])
@@ -463,25 +537,42 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_charge_battery_pass(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_setting_value = MagicMock()
-        self.cl.get_setting_value.return_value = True
-        self.cl.setting_value = 10
+        self.cl._request_setting_value = MagicMock()
+        self.cl._request_setting_value.side_effect = [10, 600]
         self.cl.set_charge_current = MagicMock()
-        self.cl.set_charge_current.side_effect = (
-            self.side_effect_set_charge_current_60
-        )
+        self.cl.set_charge_current.return_value = True
 
         status = self.cl.optim_charge_battery("INV", "normal_charge")
 
         stdout = self.stdio.getvalue()
         self.assertIn("Battery charging optimization was successful", stdout)
-        self.cl.get_setting_value.assert_has_calls([
+        self.cl._request_setting_value.assert_has_calls([
             call("INV", "battery_charge_current"),
             call("INV", "battery_charge_current"),
         ])
         self.cl.set_charge_current.assert_called_once_with("INV", 60)
         self.assertTrue(status)
 
+    @patch.dict("os.environ", {"SHINE_VERIFY_SETTINGS": ""})
+    def test_optim_charge_battery_pass_no_verification(self):
+        token_ttl_date = datetime.now() + timedelta(minutes=30)
+        self.cl.token_ttl = token_ttl_date.timestamp()
+        self.cl._request_setting_value = MagicMock()
+        self.cl._request_setting_value.return_value = 10
+        self.cl.set_charge_current = MagicMock()
+        self.cl.set_charge_current.return_value = True
+
+        status = self.cl.optim_charge_battery("INV", "normal_charge")
+
+        stdout = self.stdio.getvalue()
+        self.assertIn("Battery charging optimization was successful", stdout)
+        self.cl._request_setting_value.assert_called_once_with(
+            "INV",
+            "battery_charge_current"
+        )
+        self.cl.set_charge_current.assert_called_once_with("INV", 60)
+        self.assertTrue(status)
+
     def test_optim_soc_check_reauthorization_failed(self):
         token_ttl_date = datetime.now() - timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
@@ -498,31 +589,32 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_soc_check_get_device_value_failed(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_device_value = MagicMock()
-        self.cl.get_device_value.return_value = False
+        self.cl._request_device_value = MagicMock()
+        self.cl._request_device_value.return_value = None
 
         with self.assertRaises(RuntimeError):
             self.cl.optim_soc_check("INV")
 
         stdout = self.stdio.getvalue()
         self.assertIn("Getting battery state of charge failed", stdout)
-        self.cl.get_device_value.assert_called_once_with("INV", "battery_soc")
+        self.cl._request_device_value.assert_called_once_with("INV",
+                                                              "battery_soc")
 
     def test_optim_soc_check_soc_more_than_50_pass(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_device_value = MagicMock()
-        self.cl.get_device_value.return_value = True
+        self.cl._request_device_value = MagicMock()
+        self.cl._request_device_value.return_value = 51
         self.cl.optim_charge_battery = MagicMock()
         self.cl.optim_charge_battery.return_value = True
-        self.cl.device_value = 51
 
         status = self.cl.optim_soc_check("INV")
 
         stdout = self.stdio.getvalue()
         self.assertIn("Battery is ready for optimization. No charge mode set",
                       stdout)
-        self.cl.get_device_value.assert_called_once_with("INV", "battery_soc")
+        self.cl._request_device_value.assert_called_once_with("INV",
+                                                              "battery_soc")
         self.cl.optim_charge_battery.assert_called_once_with("INV",
                                                              "no_charge")
         self.assertTrue(status)
@@ -530,11 +622,10 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_soc_check_soc_more_less_50_scheduled_pass(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_device_value = MagicMock()
-        self.cl.get_device_value.return_value = True
+        self.cl._request_device_value = MagicMock()
+        self.cl._request_device_value.return_value = 49
         self.cl.optim_charge_battery = MagicMock()
         self.cl.optim_charge_battery.return_value = True
-        self.cl.device_value = 49
         self.cl.optim_date = datetime.now() + timedelta(minutes=120)
 
         self.cl.scheduler.start()
@@ -545,7 +636,8 @@ class TestOptimShine(unittest.TestCase):
         self.assertIn("Battery needs to be charge before optimization",
                       stdout)
         self.assertIn("Job ID: optim_soc_check_inv_INV, Next run:", stdout)
-        self.cl.get_device_value.assert_called_once_with("INV", "battery_soc")
+        self.cl._request_device_value.assert_called_once_with("INV",
+                                                              "battery_soc")
         self.cl.optim_charge_battery.assert_called_once_with("INV",
                                                              "slow_charge")
         self.assertTrue(status)
@@ -553,11 +645,10 @@ class TestOptimShine(unittest.TestCase):
     def test_optim_soc_check_soc_more_less_50_not_scheduled_pass(self):
         token_ttl_date = datetime.now() + timedelta(minutes=30)
         self.cl.token_ttl = token_ttl_date.timestamp()
-        self.cl.get_device_value = MagicMock()
-        self.cl.get_device_value.return_value = True
+        self.cl._request_device_value = MagicMock()
+        self.cl._request_device_value.return_value = 49
         self.cl.optim_charge_battery = MagicMock()
         self.cl.optim_charge_battery.return_value = True
-        self.cl.device_value = 49
         self.cl.optim_date = datetime.now() + timedelta(minutes=26)
 
         self.cl.scheduler.start()
@@ -568,7 +659,8 @@ class TestOptimShine(unittest.TestCase):
         self.assertIn("Battery needs to be charge before optimization",
                       stdout)
         self.assertIn("No scheduled jobs", stdout)
-        self.cl.get_device_value.assert_called_once_with("INV", "battery_soc")
+        self.cl._request_device_value.assert_called_once_with("INV",
+                                                              "battery_soc")
         self.cl.optim_charge_battery.assert_called_once_with("INV",
                                                              "slow_charge")
         self.assertTrue(status)
@@ -736,6 +828,28 @@ class TestOptimShine(unittest.TestCase):
         self.assertIn("List of jobs", stdout)
         self.assertIsNotNone(job)
 
+    @patch.dict("os.environ", {"WATCHDOG_USEC": "30000000"})
+    def test_get_watchdog_interval(self):
+        self.assertEqual(self.cl._get_watchdog_interval(), 15)
+
+    @patch.dict("os.environ", {"WATCHDOG_USEC": "wrong"})
+    def test_get_watchdog_interval_wrong_value(self):
+        self.assertEqual(self.cl._get_watchdog_interval(), 5)
+        self.assertIn("Wrong WATCHDOG_USEC value: wrong",
+                      self.stdio.getvalue())
+
+    @patch.dict("os.environ", {"WATCHDOG_USEC": "0"})
+    def test_get_watchdog_interval_zero(self):
+        self.assertEqual(self.cl._get_watchdog_interval(), 5)
+        self.assertIn("Wrong WATCHDOG_USEC value: 0",
+                      self.stdio.getvalue())
+
+    @patch.dict("os.environ", {"WATCHDOG_USEC": "-30000000"})
+    def test_get_watchdog_interval_negative(self):
+        self.assertEqual(self.cl._get_watchdog_interval(), 5)
+        self.assertIn("Wrong WATCHDOG_USEC value: -30000000",
+                      self.stdio.getvalue())
+
     @patch("optimshine.optim_shine.datetime")
     def test_optim_main_same_day(self, datetime_mock):
         self.cl._shine_setup = MagicMock()
@@ -786,6 +900,7 @@ class TestOptimShine(unittest.TestCase):
         self.cl.scheduler.get_jobs = MagicMock()
         self.cl.scheduler.get_jobs.side_effect = [True, None]
         self.cl.notifier.notify = MagicMock()
+        self.cl._jobs_done.set()
         datetime_mock.now.return_value = datetime.now().replace(
             hour=7, minute=6, second=0, microsecond=0,
         ) + timedelta(days=1)